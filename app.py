@@ -1,12 +1,52 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, current_app, g, has_request_context
+from flask.cli import with_appcontext
 from flask_restful import Api, Resource
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import re
+import copy
+import json
+import base64
+import time
+import random
+import hashlib
+import zlib
+import gzip
+import io
+import sys
+import fcntl
+import tempfile
+import unicodedata
+import sqlite3
+import threading
+import atexit
+import weakref
+import click
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property, lru_cache
+from json.encoder import encode_basestring as encode_json_str  # ensure_ascii=False 인 C 구현
 from dotenv import load_dotenv
-import pyodbc
-from datetime import datetime
+try:
+    import orjson  # 선택 의존성: 설치되어 있으면 응답 JSON 인코딩에 사용
+except ImportError:
+    orjson = None
+from datetime import date, datetime, timezone
+from urllib.parse import quote_plus
+from sqlalchemy import event, and_, or_
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.schema import CreateColumn
+from werkzeug.http import http_date, quote_etag
+
+ORJSON_FRAGMENT = hasattr(orjson, 'Fragment')  # RawJSON 삽입에 필요 (orjson 3.9+)
 
 # .env 파일 로드
 load_dotenv()
@@ -18,25 +58,166 @@ password = os.getenv('DB_PASSWORD')
 driver = '{ODBC Driver 17 for SQL Server}'
 port = 1433
 
-# pyodbc 연결 인코딩 설정
-pyodbc.pooling = False  # 한글 깨짐 방지
-connection_string = f"DRIVER={driver};SERVER={server},{port};DATABASE={database};UID={username};PWD={password};Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;"
+# 커넥션 풀 / 엔진 설정 (.env 에서 조정 가능)
+DATABASE_URL = os.getenv('DATABASE_URL')  # 지정 시 SQL Server 대신 사용 (예: sqlite:///local.db)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  # 풀에서 커넥션을 기다리는 최대 시간(초)
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # Azure SQL 유휴 연결 끊김 방지
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'
+DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 30))  # 쿼리 한 건당 제한 시간(초), 0이면 무제한
+DB_FAST_EXECUTEMANY = os.getenv('DB_FAST_EXECUTEMANY', '1') == '1'
+# 읽기 전용 복제본 (쉼표로 여러 개 지정, GET 요청의 SELECT 를 나눠서 보냄)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))  # 쓰기 후 primary 에서 읽는 시간
+
+def default_database_uri():
+    """DATABASE_URL 이 없으면 .env 의 SQL Server 접속 정보로 URI 생성"""
+    if DATABASE_URL:
+        return DATABASE_URL
+
+    import pyodbc
+
+    # ODBC 드라이버 매니저 풀링은 끄고 SQLAlchemy 커넥션 풀을 사용
+    # (한글 인코딩은 아래 connect 이벤트에서 커넥션마다 명시적으로 설정)
+    pyodbc.pooling = False
+    connection_string = f"DRIVER={driver};SERVER={server},{port};DATABASE={database};UID={username};PWD={password};Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;"
+    return f"mssql+pyodbc:///?odbc_connect={quote_plus(connection_string)}"
+
+
+def build_engine_options(uri):
+    """DB 종류에 맞는 SQLAlchemy 엔진 옵션 생성"""
+    url = make_url(uri)
+    options = {'pool_pre_ping': DB_POOL_PRE_PING}
+
+    # 메모리 SQLite 는 단일 커넥션 풀을 사용하므로 풀 크기 옵션을 줄 수 없음
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
 
-app = Flask(__name__)
+    if url.get_backend_name() == 'mssql':
+        options['fast_executemany'] = DB_FAST_EXECUTEMANY
+    elif url.get_backend_name() == 'sqlite':
+        # 여러 워커 스레드에서 같은 파일을 공유하므로 잠금 대기 시간 설정
+        options['connect_args'] = {'check_same_thread': False, 'timeout': DB_STATEMENT_TIMEOUT or 30}
+    return options
 
-# CORS 설정을 더 구체적으로 지정
-CORS(app, resources={
-    r"/*": {
-        "origins": ["*"],  # 모든 출처 허용 (개발 환경용)
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    }
-})
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mssql+pyodbc:///?odbc_connect={connection_string}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
-api = Api(app)
+def on_connect(dbapi_connection, connection_record):
+    """새 DBAPI 커넥션이 만들어질 때마다 인코딩 / 쿼리 타임아웃 설정"""
+    if hasattr(dbapi_connection, 'setdecoding'):  # pyodbc
+        import pyodbc
+
+        # 한글 깨짐 방지: NVARCHAR 는 UTF-16LE, VARCHAR 는 UTF-8 로 주고받음
+        dbapi_connection.setdecoding(pyodbc.SQL_CHAR, encoding='utf-8')
+        dbapi_connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-16le')
+        dbapi_connection.setencoding(encoding='utf-16le')
+        dbapi_connection.timeout = DB_STATEMENT_TIMEOUT
+
+
+class RoutingSession(FlaskSession):
+    """GET 요청의 SELECT 는 g.db_replica 복제본으로, 쓰기와 그 밖의 쿼리는 primary 로 보내는 세션"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('db_replica'):
+            if not self._flushing and getattr(clause, 'is_select', False):
+                return self._db.engines[g.db_replica]
+            # 요청 중에 쓰기가 시작되면 이후 조회도 primary 에서 (같은 트랜잭션 안의 재계산 등)
+            g.db_replica = None
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+# 비밀번호 해시 설정 (요청 워커 대신 별도 프로세스 풀에서 계산)
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')  # 예: scrypt:32768:8:1, pbkdf2:sha256:1000000
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', min(2, os.cpu_count() or 1)))  # 0이면 요청 스레드에서 계산
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 64))  # 동시에 대기할 수 있는 해시 작업 수
+PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 30))  # 초
+
+
+class PasswordHasherBusy(Exception):
+    """해시 작업 대기열이 가득 찼거나 제한 시간 안에 끝나지 않음 (503 + Retry-After)"""
+
+
+class PasswordHasher:
+    """비밀번호 해시 전용 프로세스 풀
+
+    gunicorn 이 워커를 fork 한 뒤 처음 사용할 때 풀을 만듦
+    """
+
+    def __init__(self, method, workers, queue_limit, timeout):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, broken=None):
+        """풀 반환 - broken 으로 받은 풀이 아직 현재 풀이면 (자식 프로세스가 죽은 경우) 새로 만듦"""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid() or self._executor is broken:
+                if self._executor is not None and self._pid == os.getpid():
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # 풀의 자식 프로세스가 죽으면 (OOM 등) 이후 제출이 모두 실패하므로 새 풀에서 한 번 더 시도
+                executor = self._get_executor(broken=executor)
+                future = executor.submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except BrokenProcessPool:
+                self._get_executor(broken=executor)
+                raise PasswordHasherBusy()
+            except FutureTimeoutError:
+                future.cancel()
+                raise PasswordHasherBusy()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    @cached_property
+    def current_prefix(self):
+        """현재 설정으로 만든 해시의 'method:params' 부분 (예: scrypt:32768:8:1)"""
+        return generate_password_hash('', self.method).split('$', 1)[0]
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.current_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_TIMEOUT
+)
 
 
 # 모델 정의
@@ -50,6 +231,8 @@ class User(db.Model):
     marketing_consent = db.Column(db.Boolean, nullable=False, default=False)  # 마케팅 동의 필드 추가
     preferences = db.Column(db.String(500), nullable=True)  # JSON 문자열로 저장될 preferences
     music_genres = db.Column(db.String(500), nullable=True)  # JSON 문자열로 저장될 music_genres
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # 일정/사진/프로필 변경 시 증가
+    data_updated_at = db.Column(db.DateTime, nullable=True)  # 마지막 data_version 증가 시각 (UTC)
 
     # music_genres를 위한 getter와 setter 메서드 추가
     def get_music_genres(self):
@@ -61,10 +244,14 @@ class User(db.Model):
         self.music_genres = json.dumps(genres)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """저장된 해시가 현재 해시 방식/비용과 다른지 확인"""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def get_preferences(self):
         import json
@@ -75,9 +262,86 @@ class User(db.Model):
         self.preferences = json.dumps(preferences)
 
 
-from sqlalchemy.dialects.postgresql import JSON
+class JSONColumn(TypeDecorator):
+    """JSON 값을 한 번만 인코딩해서 저장하는 컬럼 타입
+
+    예전에 두 번 인코딩된 행은 마이그레이션 8 (unwrap_double_encoded_json) 에서 한 번만 정리
+    """
+    impl = db.UnicodeText
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return json.loads(value)
+
+
+class RawJSON(str):
+    """DB 에 저장된 JSON 텍스트 그대로 (응답에 파싱/재인코딩 없이 삽입)"""
+
+
+def as_raw_json(value):
+    """JSONColumn 원본 텍스트를 RawJSON 으로 변환"""
+    if value is None:
+        return None
+    return RawJSON(value)
+
+
+def unwrap_double_encoded_json(text):
+    """json.dumps 문자열을 한 번 더 인코딩해서 저장한 값이면 안쪽 JSON 텍스트, 아니면 None
+
+    예전 POST 는 모든 값을 두 번 인코딩했으므로 안쪽 문자열이 유효한 JSON 이면 종류와 상관없이 벗김
+    ("null", "\"bus\"" 도 포함, "memo" 처럼 JSON 이 아닌 문자열 값은 그대로)
+    """
+    if not text or not text.startswith('"'):
+        return None
+    try:
+        inner = json.loads(text)
+        if not isinstance(inner, str):
+            return None
+        json.loads(inner)
+    except ValueError:
+        return None
+    return inner
+
+
+def _orjson_default(obj):
+    if isinstance(obj, RawJSON):
+        return orjson.Fragment(str(obj))
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj):
+    """RawJSON 조각은 그대로 이어 붙이고 나머지는 JSON 으로 인코딩 (orjson 이 있으면 사용)"""
+    if isinstance(obj, RawJSON):
+        return obj
+    if ORJSON_FRAGMENT:
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_PASSTHROUGH_SUBCLASS).decode()
+    if isinstance(obj, dict):
+        return '{' + ','.join(
+            encode_json_str(str(key)) + ':' + dumps_json(value) for key, value in obj.items()
+        ) + '}'
+    if isinstance(obj, (list, tuple)):
+        return '[' + ','.join(dumps_json(value) for value in obj) + ']'
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def raw_json_property(column):
+    """JSON 컬럼을 파싱하지 않은 텍스트로 읽는 속성 (요청할 때만 SELECT)"""
+    return db.column_property(db.type_coerce(column, db.UnicodeText), deferred=True)
+
 
 class TravelSchedule(db.Model):
+    __table_args__ = (
+        db.Index('ix_travel_schedule_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_travel_schedule_user_id_start_date_end_date', 'user_id', 'start_date', 'end_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     trip_id = db.Column(db.String(255), unique=True, nullable=False)
@@ -88,16 +352,30 @@ class TravelSchedule(db.Model):
     end_date = db.Column(db.Date, nullable=False)
     duration = db.Column(db.String(50), nullable=False)
     budget = db.Column(db.String(100), nullable=True)
-    transportation = db.Column(JSON, nullable=True)
-    keywords = db.Column(JSON, nullable=True)
+    transportation = db.Column(JSONColumn, nullable=True)
+    keywords = db.Column(JSONColumn, nullable=True)
     summary = db.Column(db.Text, nullable=True)
-    days = db.Column(JSON, nullable=False)
-    extra_info = db.Column(JSON, nullable=True)
+    days = db.Column(JSONColumn, nullable=False)
+    extra_info = db.Column(JSONColumn, nullable=True)
     generated_schedule_raw = db.Column(db.Text, nullable=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # 행 버전 (수정 시 증가)
+
+    # 응답용 원본 JSON 텍스트
+    transportation_json = raw_json_property(transportation)
+    keywords_json = raw_json_property(keywords)
+    days_json = raw_json_property(days)
+    extra_info_json = raw_json_property(extra_info)
 
     user = db.relationship('User', backref=db.backref('schedules', lazy=True))
 
+    __mapper_args__ = {'version_id_col': version}
+
 class AdditionalTravelSchedule(db.Model):
+    __table_args__ = (
+        db.Index('ix_additional_travel_schedule_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_additional_travel_schedule_user_id_start_date_end_date', 'user_id', 'start_date', 'end_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     trip_id = db.Column(db.String(255), unique=True, nullable=False)
@@ -108,15 +386,39 @@ class AdditionalTravelSchedule(db.Model):
     end_date = db.Column(db.Date, nullable=False)
     duration = db.Column(db.String(50), nullable=False)
     budget = db.Column(db.String(100), nullable=True)
-    transportation = db.Column(JSON, nullable=True)
-    keywords = db.Column(JSON, nullable=True)
+    transportation = db.Column(JSONColumn, nullable=True)
+    keywords = db.Column(JSONColumn, nullable=True)
     summary = db.Column(db.Text, nullable=True)
-    days = db.Column(JSON, nullable=False)
-    extra_info = db.Column(JSON, nullable=True)
+    days = db.Column(JSONColumn, nullable=False)
+    extra_info = db.Column(JSONColumn, nullable=True)
     generated_schedule_raw = db.Column(db.Text, nullable=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # 행 버전 (수정 시 증가)
+
+    # 응답용 원본 JSON 텍스트
+    transportation_json = raw_json_property(transportation)
+    keywords_json = raw_json_property(keywords)
+    days_json = raw_json_property(days)
+    extra_info_json = raw_json_property(extra_info)
 
     user = db.relationship('User', backref=db.backref('additional_schedules', lazy=True))
 
+    __mapper_args__ = {'version_id_col': version}
+
+# 일정 검색 색인 (검색어 -> 일정) - 일정 등록 / 삭제와 같은 트랜잭션에서 갱신
+class ScheduleSearchTerm(db.Model):
+    __tablename__ = 'schedule_search_term'
+    __table_args__ = (
+        # 사용자별 검색어 조회가 테이블을 읽지 않도록 schedule_id, weight 까지 포함
+        db.Index('ix_schedule_search_term_lookup', 'user_id', 'source', 'term', 'schedule_id', 'weight'),
+    )
+
+    # PK 는 일정 삭제 시 schedule_id 로 찾도록 schedule_id 를 앞에 둠
+    schedule_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    source = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)  # SEARCH_SOURCES 값
+    term = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    weight = db.Column(db.Integer, nullable=False)
+
 class Feedback(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     rating = db.Column(db.Integer, nullable=False)  # 별점
@@ -124,26 +426,314 @@ class Feedback(db.Model):
     comment = db.Column(db.String(1000), nullable=True)  # 자유롭게 기재할 수 있는 피드백
 
 
+# 피드백 집계 (행 하나) - 피드백 등록과 같은 트랜잭션에서 증가시켜 조회는 O(1)
+FEEDBACK_RATINGS = range(1, 6)
+
+
+class FeedbackStats(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    deduction_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+
+def normalize_location(location):
+    """위치 비교용 키 - 유니코드 정규화(NFKC), 대소문자 무시, 연속 공백 정리"""
+    if location is None:
+        return None
+    return ' '.join(unicodedata.normalize('NFKC', location).casefold().split()) or None
+
+
+def default_location_key(context):
+    return normalize_location(context.get_current_parameters().get('location'))
+
+
 # 모델 정의
 class Photo(db.Model):
+    __table_args__ = (
+        db.Index('ix_photo_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_photo_user_id_location_key_timestamp', 'user_id', 'location_key', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     photo_uri = db.Column(db.String(255), nullable=False)
     location = db.Column(db.String(255), nullable=True)
+    location_key = db.Column(db.String(255), nullable=True, default=default_location_key)  # 위치 필터용 정규화 키
     timestamp = db.Column(db.DateTime, nullable=False)
 
     user = db.relationship('User', backref=db.backref('photos', lazy=True))
 
 
-# 데이터베이스 테이블 생성 (첫 실행 시)
-try:
-    with app.app_context():
-        db.create_all()
-except Exception as e:
-    print(f"Error creating database tables: {e}")
+# 필드 종류별 JSON 텍스트 변환식 ({v} 자리에 속성 값)
+_JSON_EXPRESSIONS = {
+    'int': "'null' if {v} is None else str(int({v}))",
+    'str': "'null' if {v} is None else _encode_str({v})",
+    'timestamp': "'null' if {v} is None else '\"' + {v}.isoformat(timespec='seconds') + 'Z\"'",
+    'timestamp_us': "'null' if {v} is None else '\"' + {v}.isoformat(timespec='microseconds') + 'Z\"'",
+    'date': "'null' if {v} is None else '\"' + {v}.isoformat() + '\"'",
+    'raw_json': "'null' if {v} is None else _as_raw_json({v})",
+}
+
+
+class RowSerializer:
+    """모델 행을 응답 JSON 으로 바꾸는 직렬화기
+
+    필드 매핑 [(API 필드명, 모델 속성, 종류), ...] 을 파이썬 코드로 한 번 컴파일해 두고
+    행마다 getattr 루프나 dict 생성 없이 JSON 텍스트(RawJSON)를 바로 만듦
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        namespace = {
+            'RawJSON': RawJSON,
+            '_encode_str': encode_json_str,
+            '_as_raw_json': as_raw_json,
+        }
+        loads = ''.join(f"    v{i} = obj.{attr}\n" for i, (_, attr, _) in enumerate(self.fields))
+        json_parts = " + ',' + ".join(
+            f"{json.dumps(json.dumps(name) + ':')} + ({_JSON_EXPRESSIONS[kind].format(v=f'v{i}')})"
+            for i, (name, _, kind) in enumerate(self.fields)
+        ) or "''"
+        source = f"def to_json(obj):\n{loads}    return RawJSON('{{' + {json_parts} + '}}')\n"
+        exec(compile(source, f'<serializer {",".join(name for name, _, _ in self.fields)}>', 'exec'), namespace)
+        self.to_json = namespace['to_json']
+
+    def __call__(self, obj):
+        return self.to_json(obj)
+
+
+# 사용자 조회 캐시 설정
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))  # 초
+USER_CACHE_SHARED_PATH = os.getenv('USER_CACHE_SHARED_PATH')  # 지정 시 워커 간 공유 (SQLite 파일)
+
+# 프로필은 캐시하지 않음 (PUT 이 다른 워커의 캐시를 비울 수 없으므로 항상 DB 에서 읽음)
+CachedUser = namedtuple('CachedUser', ['id', 'username'])
+
+
+def user_profile(user):
+    """사용자 정보 응답 (로그인 / 프로필 조회 공통)"""
+    return {
+        "username": user.username,
+        "nickname": user.nickname,
+        "birthyear": user.birthyear,
+        "gender": user.gender,
+        "marketing_consent": user.marketing_consent,
+        "preferences": user.get_preferences(),
+        "music_genres": user.get_music_genres()
+    }
+
+
+class UserCache:
+    """username -> id LRU + TTL 캐시 (워커 프로세스 메모리)"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user):
+        with self._lock:
+            self._entries[user.username] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SharedSQLiteStore:
+    """gunicorn 워커끼리 공유하는 로컬 SQLite 파일 (스레드 / 프로세스마다 별도 커넥션)"""
+
+    def _open_shared(self, path, schema):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(schema)
+
+    def _connect(self):
+        # 스레드 / 프로세스(fork) 마다 별도 커넥션 사용
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+
+class SharedUserCache(SharedSQLiteStore, UserCache):
+    """gunicorn 워커끼리 공유하는 LRU + TTL 캐시 (로컬 SQLite 파일에 저장)
+
+    조회 시 last_used 를 갱신하고 크기를 넘으면 가장 오래 쓰이지 않은 항목부터 제거
+    (같은 항목의 갱신은 TOUCH_INTERVAL 초에 한 번만 - 자주 조회되는 사용자마다 쓰기가 생기지 않도록)
+    """
+    SCHEMA = ('CREATE TABLE IF NOT EXISTS user_id_cache (username TEXT PRIMARY KEY, payload TEXT NOT NULL, '
+              'expires_at REAL NOT NULL, last_used REAL NOT NULL)')
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path, maxsize, ttl):
+        UserCache.__init__(self, maxsize, ttl)
+        self._open_shared(path, self.SCHEMA)
+        # 프로필까지 저장하던 예전 캐시 테이블은 삭제
+        self._connect().execute('DROP TABLE IF EXISTS user_cache')
+
+    def get(self, username):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            'SELECT payload, last_used FROM user_id_cache WHERE username = ? AND expires_at >= ?', (username, now)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        if now - row[1] >= self.TOUCH_INTERVAL:
+            conn.execute('UPDATE user_id_cache SET last_used = ? WHERE username = ?', (now, username))
+        return CachedUser(*json.loads(row[0]))
+
+    def set(self, user):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO user_id_cache (username, payload, expires_at, last_used) VALUES (?, ?, ?, ?)',
+            (user.username, json.dumps(list(user), ensure_ascii=False), now + self.ttl, now)
+        )
+        # 크기 제한: 만료된 항목과 가장 오래 쓰이지 않은 항목부터 제거
+        conn.execute('DELETE FROM user_id_cache WHERE expires_at < ?', (now,))
+        conn.execute(
+            'DELETE FROM user_id_cache WHERE username IN '
+            '(SELECT username FROM user_id_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.maxsize,)
+        )
+
+    def clear(self):
+        self._connect().execute('DELETE FROM user_id_cache')
+
+    def stats(self):
+        size = self._connect().execute('SELECT COUNT(*) FROM user_id_cache').fetchone()[0]
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+if USER_CACHE_SHARED_PATH:
+    user_cache = SharedUserCache(USER_CACHE_SHARED_PATH, USER_CACHE_SIZE, USER_CACHE_TTL)
+else:
+    user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+class WriteTracker:
+    """최근에 쓰기를 한 사용자 (read-your-writes) - 이 사용자들의 GET 은 잠시 primary 에서 읽음"""
+
+    def __init__(self, window, maxsize):
+        self.window = window
+        self.maxsize = maxsize
+        self._until = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, usernames):
+        until = time.monotonic() + self.window
+        with self._lock:
+            for username in usernames:
+                self._until[username] = until
+                self._until.move_to_end(username)
+            while len(self._until) > self.maxsize:
+                self._until.popitem(last=False)
+
+    def recent(self, usernames):
+        now = time.monotonic()
+        with self._lock:
+            return any(self._until.get(username, 0) > now for username in usernames)
+
+
+class SharedWriteTracker(SharedSQLiteStore, WriteTracker):
+    """워커끼리 공유하는 WriteTracker - 쓰기를 받은 워커와 다른 워커가 GET 을 받아도 primary 로 보냄"""
+
+    def __init__(self, path, window, maxsize):
+        WriteTracker.__init__(self, window, maxsize)
+        self._open_shared(path, 'CREATE TABLE IF NOT EXISTS recent_writes '
+                                '(username TEXT PRIMARY KEY, until REAL NOT NULL)')
+
+    def mark(self, usernames):
+        now = time.time()
+        conn = self._connect()
+        conn.executemany('INSERT OR REPLACE INTO recent_writes (username, until) VALUES (?, ?)',
+                         [(username, now + self.window) for username in usernames])
+        conn.execute('DELETE FROM recent_writes WHERE until < ?', (now,))
+
+    def recent(self, usernames):
+        usernames = list(usernames)
+        if not usernames:
+            return False
+        placeholders = ','.join('?' * len(usernames))
+        return self._connect().execute(
+            f'SELECT 1 FROM recent_writes WHERE until > ? AND username IN ({placeholders}) LIMIT 1',
+            [time.time(), *usernames]
+        ).fetchone() is not None
+
+
+if USER_CACHE_SHARED_PATH:
+    write_tracker = SharedWriteTracker(USER_CACHE_SHARED_PATH, READ_YOUR_WRITES_SECONDS, USER_CACHE_SIZE)
+else:
+    write_tracker = WriteTracker(READ_YOUR_WRITES_SECONDS, USER_CACHE_SIZE)
+
+
+def get_user(username):
+    """username 으로 사용자 조회 (캐시 우선, 없으면 DB 조회 후 캐시에 저장)"""
+    if not username:
+        return None
+    cached = user_cache.get(username)
+    if cached is not None:
+        return cached
+
+    user_id = db.session.query(User.id).filter_by(username=username).scalar()
+    if user_id is None:
+        return None
+    cached = CachedUser(user_id, username)
+    user_cache.set(cached)
+    return cached
 
 
 # 회원가입 API
+def duplicate_user_message(username=None, nickname=None, exclude_username=None):
+    """IntegrityError 가 username / nickname 중복 때문인지 조회로 확인 (아니면 None)"""
+    if username and User.query.filter_by(username=username).first():
+        return "Username already exists"
+    if nickname:
+        query = User.query.filter_by(nickname=nickname)
+        if exclude_username:
+            query = query.filter(User.username != exclude_username)
+        if query.first():
+            return "Nickname already exists"
+    return None
+
+
 class UserRegistration(Resource):
     def post(self):
         data = request.get_json()
@@ -160,12 +750,6 @@ class UserRegistration(Resource):
         if not all([username, password, nickname, birthyear, gender]):
             return {"message": "Missing required fields"}, 400
 
-        # 중복된 사용자 이름이나 닉네임이 있는지 확인
-        if User.query.filter_by(username=username).first():
-            return {"message": "Username already exists"}, 400
-        if User.query.filter_by(nickname=nickname).first():
-            return {"message": "Nickname already exists"}, 400
-
         # 새 사용자 생성
         new_user = User(
             username=username,
@@ -174,11 +758,20 @@ class UserRegistration(Resource):
             gender=gender,
             marketing_consent=marketing_consent
         )
-        new_user.set_password(password)
+        try:
+            new_user.set_password(password)
+        except PasswordHasherBusy:
+            return {"message": "Server busy, please retry"}, 503, {'Retry-After': '1'}
         new_user.set_preferences(preferences)
         new_user.set_music_genres(music_genres)
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # 중복된 사용자 이름이나 닉네임 (unique 제약 위반 시에만 어느 쪽인지 조회)
+            db.session.rollback()
+            message = duplicate_user_message(username, nickname)
+            return {"message": message or f"Invalid user data: {e.orig}"}, 400
 
         return {"message": "User created successfully"}, 201
 
@@ -189,18 +782,19 @@ class UserLogin(Resource):
         data = request.get_json()
         user = User.query.filter_by(username=data['username']).first()
 
-        if user and user.check_password(data['password']):
+        try:
+            valid = user and user.check_password(data['password'])
+            if valid and user.password_needs_rehash():
+                # 예전 방식으로 저장된 해시는 로그인 성공 시 현재 설정으로 다시 저장
+                user.set_password(data['password'])
+                db.session.commit()
+        except PasswordHasherBusy:
+            return {"message": "Server busy, please retry"}, 503, {'Retry-After': '1'}
+
+        if valid:
             return {
                 "message": "Logged in successfully",
-                "user_info": {
-                    "username": user.username,
-                    "nickname": user.nickname,
-                    "birthyear": user.birthyear,
-                    "gender": user.gender,
-                    "marketing_consent": user.marketing_consent,
-                    "preferences": user.get_preferences(),
-                    "music_genres": user.get_music_genres()
-                }
+                "user_info": user_profile(user)
             }, 200
         return {"message": "Invalid username or password"}, 401
 
@@ -209,148 +803,854 @@ class UserLogin(Resource):
 class UserProfile(Resource):
     def get(self, username):
         """특정 사용자 정보 조회"""
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        return {
-            "username": user.username,
-            "nickname": user.nickname,
-            "birthyear": user.birthyear,
-            "gender": user.gender,
-            "marketing_consent": user.marketing_consent,
-            "preferences": user.get_preferences(),
-            "music_genres": user.get_music_genres()
-        }, 200
+        # 프로필과 data_version (PUT 마다 증가) 을 PK 조회 한 번으로 읽어서 ETag 계산
+        row = db.session.get(User, user.id)
+        return conditional_response(make_etag('user', row.id, row.data_version), row.data_updated_at,
+                                    lambda: (user_profile(row), 200))
 
     def put(self, username):
         """사용자 정보 수정"""
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return {"message": "User not found"}, 404
-
         data = request.get_json()
 
-        # 변경 가능한 필드만 업데이트
+        # 변경 가능한 필드만 업데이트 (UPDATE 한 번으로 처리, 닉네임 중복은 unique 제약으로 확인)
+        values = {}
         if 'nickname' in data:
-            if User.query.filter_by(nickname=data['nickname']).first():
-                return {"message": "Nickname already exists"}, 400
-            user.nickname = data['nickname']
+            values['nickname'] = data['nickname']
 
         if 'birthyear' in data:
-            user.birthyear = data['birthyear']
+            values['birthyear'] = data['birthyear']
 
         if 'gender' in data:
-            user.gender = data['gender']
+            values['gender'] = data['gender']
 
         if 'marketing_consent' in data:
-            user.marketing_consent = bool(data['marketing_consent'])
+            values['marketing_consent'] = bool(data['marketing_consent'])
 
         if 'preferences' in data:
-            user.set_preferences(data['preferences'])
+            values['preferences'] = json.dumps(data['preferences'])
 
         if 'music_genres' in data:
-            user.set_music_genres(data['music_genres'])
+            values['music_genres'] = json.dumps(data['music_genres'])
+
+        if values:
+            values[User.data_version] = User.data_version + 1
+            values[User.data_updated_at] = datetime.utcnow()
+        else:
+            if not get_user(username):
+                return {"message": "User not found"}, 404
+            return {"message": "User information updated successfully"}, 200
+
+        try:
+            updated = User.query.filter_by(username=username).update(values, synchronize_session=False)
+            db.session.commit()
+        except IntegrityError as e:
+            # NOT NULL 등 다른 제약 위반은 닉네임 중복으로 보고하지 않음
+            db.session.rollback()
+            message = duplicate_user_message(nickname=values.get('nickname'), exclude_username=username)
+            return {"message": message or f"Invalid user data: {e.orig}"}, 400
+
+        if not updated:
+            return {"message": "User not found"}, 404
 
-        db.session.commit()
         return {"message": "User information updated successfully"}, 200
 
 
 # 여행 일정 API
-from datetime import datetime
-import json
+
+# 목록 조회 페이지네이션 설정
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+STREAM_BATCH_SIZE = 500  # 스트리밍 시 한 번에 DB 에서 가져오는 행 수
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """마지막 행의 정렬 키를 불투명한 커서 문자열로 변환"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def apply_keyset(query, model, order, after):
+    """id 또는 (timestamp, id) 기준 keyset 조건과 정렬 적용 (앞에 '-' 가 붙으면 내림차순)"""
+    descending = order.startswith('-')
+    direction = (lambda column: column.desc()) if descending else (lambda column: column)
+    beyond = (lambda column, value: column < value) if descending else (lambda column, value: column > value)
+
+    if order.lstrip('-') == 'timestamp':
+        query = query.order_by(direction(model.timestamp), direction(model.id))
+        if after:
+            values = decode_cursor(after)
+            try:
+                last_timestamp, last_id = datetime.fromisoformat(values[0]), int(values[1])
+            except (ValueError, TypeError, IndexError, KeyError):
+                raise InvalidCursor(after)
+            query = query.filter(or_(
+                beyond(model.timestamp, last_timestamp),
+                and_(model.timestamp == last_timestamp, beyond(model.id, last_id))
+            ))
+    else:
+        query = query.order_by(direction(model.id))
+        if after:
+            values = decode_cursor(after)
+            try:
+                last_id = int(values[0])
+            except (ValueError, TypeError, IndexError, KeyError):
+                raise InvalidCursor(after)
+            query = query.filter(beyond(model.id, last_id))
+    return query
+
+
+def cursor_for(row, order):
+    if order.lstrip('-') == 'timestamp':
+        return encode_cursor([row.timestamp.isoformat(), row.id])
+    return encode_cursor([row.id])
+
+
+def stream_json_array(query, serialize):
+    """yield_per 로 행을 나눠 읽으면서 JSON 배열을 조각 단위로 내보냄"""
+    def generate():
+        yield '['
+        for index, row in enumerate(query.yield_per(STREAM_BATCH_SIZE)):
+            if index:
+                yield ','
+            yield dumps_json(serialize(row))
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def list_response(query, model, serialize, orders=('id',)):
+    """목록 API 공통 응답 처리
+
+    - limit / after: keyset 페이지네이션 (다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+    - order: id 또는 timestamp 정렬 (orders 에 '-timestamp' 가 있으면 최신순도 허용)
+    - stream=1: 전체 결과를 JSON 배열로 스트리밍
+    - 파라미터가 없으면 기존처럼 전체 목록 반환 (워커 메모리에 모두 올리지 않도록 stream=1 과 같이 스트리밍)
+    """
+    order = request.args.get('order', orders[0])
+    if order not in orders:
+        return {"message": f"order must be one of: {', '.join(orders)}"}, 400
+
+    after = request.args.get('after')
+    limit = request.args.get('limit')
+    stream = request.args.get('stream') in ('1', 'true')
+
+    try:
+        query = apply_keyset(query, model, order, after)
+    except InvalidCursor:
+        return {"message": "Invalid cursor"}, 400
+
+    if stream and limit is not None:
+        return {"message": "limit cannot be combined with stream"}, 400
+    if stream or (limit is None and after is None):
+        return stream_json_array(query, serialize)
+
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_LIMIT
+    except ValueError:
+        return {"message": "limit must be an integer"}, 400
+    if not (1 <= limit <= MAX_PAGE_LIMIT):
+        return {"message": f"limit must be between 1 and {MAX_PAGE_LIMIT}"}, 400
+
+    # 한 행을 더 읽어서 다음 페이지 존재 여부 확인
+    rows = query.limit(limit + 1).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers['X-Next-Cursor'] = cursor_for(rows[-1], order)
+    return [serialize(row) for row in rows], 200, headers
+
+
+# API 필드명 -> (모델 속성, 종류)
+SCHEDULE_FIELDS = {
+    "id": ('id', 'int'),
+    "tripId": ('trip_id', 'str'),
+    "timestamp": ('timestamp', 'timestamp'),
+    "title": ('title', 'str'),
+    "companion": ('companion', 'str'),
+    "startDate": ('start_date', 'date'),
+    "endDate": ('end_date', 'date'),
+    "duration": ('duration', 'str'),
+    "budget": ('budget', 'str'),
+    "transportation": ('transportation_json', 'raw_json'),
+    "keywords": ('keywords_json', 'raw_json'),
+    "summary": ('summary', 'str'),
+    "days": ('days_json', 'raw_json'),
+    "extraInfo": ('extra_info_json', 'raw_json'),
+    "generatedScheduleRaw": ('generated_schedule_raw', 'str'),
+}
+
+# 여행 목록 화면용 요약 필드 (days, generatedScheduleRaw 등 큰 컬럼 제외)
+SCHEDULE_SUMMARY_FIELDS = ('id', 'tripId', 'timestamp', 'title', 'companion', 'startDate', 'endDate', 'duration')
+
+
+@lru_cache(maxsize=64)
+def make_schedule_serializer(fields):
+    """지정한 필드만 직렬화하는 RowSerializer (필드 조합별로 한 번만 컴파일)"""
+    return RowSerializer((name,) + SCHEDULE_FIELDS[name] for name in fields)
+
+
+# 상세 조회 응답에는 id 가 없음
+SCHEDULE_DETAIL_FIELDS = tuple(name for name in SCHEDULE_FIELDS if name != 'id')
+
+serialize_schedule = make_schedule_serializer(tuple(SCHEDULE_FIELDS))
+serialize_schedule_detail = make_schedule_serializer(SCHEDULE_DETAIL_FIELDS)
+
+
+def requested_schedule_fields():
+    """view=summary 또는 fields=a,b,c 요청에 맞는 필드 목록 (지정하지 않으면 전체)
+
+    fields 는 SCHEDULE_FIELDS 순서로 정렬해서 반환 (순서만 다른 요청마다 직렬화기를 새로 컴파일하지 않도록)
+    """
+    if request.args.get('view') == 'summary':
+        return SCHEDULE_SUMMARY_FIELDS
+    if request.args.get('fields'):
+        requested = tuple(dict.fromkeys(name.strip() for name in request.args['fields'].split(',') if name.strip()))
+        unknown = [name for name in requested if name not in SCHEDULE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return tuple(name for name in SCHEDULE_FIELDS if name in requested)
+    return tuple(SCHEDULE_FIELDS)
+
+
+def parse_date_arg(name):
+    """쿼리 문자열의 날짜 (YYYY-MM-DD)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def apply_date_range(query, model):
+    """from / to 기간과 겹치는 일정만 (start_date <= to, end_date >= from - 양 끝 날짜 포함)
+
+    (user_id, start_date, end_date) 인덱스에서 start_date 범위를 읽고 end_date 는 인덱스 안에서 확인
+    """
+    since, until = parse_date_arg('from'), parse_date_arg('to')
+    if since and until and since > until:
+        raise ValueError("from must not be later than to")
+    if until:
+        query = query.filter(model.start_date <= until)
+    if since:
+        query = query.filter(model.end_date >= since)
+    return query
+
+
+def schedule_load_options(model, fields):
+    """필요한 컬럼만 SELECT 하도록 load_only 옵션 생성
+
+    요청하지 않은 컬럼은 DB 에서 읽지도 않고, JSON 컬럼은 파싱 없이 원본 텍스트로 읽음
+    """
+    # 커서 생성과 소유자 확인에 필요한 컬럼은 항상 읽음
+    attrs = {'id', 'user_id', 'timestamp', 'version'} | {SCHEDULE_FIELDS[name][0] for name in fields}
+    return [load_only(*[getattr(model, attr) for attr in attrs], raiseload=True)]
+
+
+serialize_photo = RowSerializer([
+    ("id", 'id', 'int'),
+    ("photoUri", 'photo_uri', 'str'),
+    ("location", 'location', 'str'),
+    ("timestamp", 'timestamp', 'timestamp'),
+])
+
+serialize_feedback = RowSerializer([
+    ("id", 'id', 'int'),
+    ("rating", 'rating', 'int'),
+    ("deduction", 'deduction', 'int'),
+    ("comment", 'comment', 'str'),
+])
+
+
+# 조건부 GET (ETag / Last-Modified)
+def make_etag(*parts):
+    """버전 정보로 강한 ETag 값 생성 (따옴표 제외)"""
+    return hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def matching_etag(etag):
+    """If-None-Match 중 etag 또는 압축 응답용 변형(etag-gzip 등)과 일치하는 태그"""
+    for candidate in [etag] + [f'{etag}-{encoding}' for encoding in COMPRESS_ENCODINGS]:
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def cached_etag(etag, last_modified=None):
+    """If-None-Match (우선) 또는 If-Modified-Since 기준으로 클라이언트 캐시가 유효하면 돌려줄 ETag 반환"""
+    if request.if_none_match:
+        return matching_etag(etag)
+    if last_modified and request.if_modified_since:
+        if last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since:
+            return etag
+    return None
+
+
+def not_modified_response(etag, last_modified=None):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def with_validators(result, etag, last_modified=None):
+    """성공(200) 응답에 ETag / Last-Modified 헤더 추가"""
+    headers = {'ETag': quote_etag(etag), 'Cache-Control': 'private, no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+
+    if isinstance(result, Response):
+        if result.status_code == 200:
+            result.headers.update(headers)
+        return result
+
+    data, code, *rest = result
+    if code != 200:
+        return result
+    return data, code, dict(rest[0] if rest else {}, **headers)
+
+
+def conditional_response(etag, last_modified, build):
+    """클라이언트 캐시가 유효하면 본문을 만들지 않고 304, 아니면 build() 결과에 검증 헤더 추가"""
+    matched = cached_etag(etag, last_modified)
+    if matched:
+        return not_modified_response(matched, last_modified)
+    return with_validators(build(), etag, last_modified)
+
+
+def user_data_version(user_id):
+    """(data_version, data_updated_at) - 목록 ETag 확인용 PK 조회 한 번"""
+    return db.session.query(User.data_version, User.data_updated_at).filter_by(id=user_id).one()
+
+
+def bump_user_version(*user_ids):
+    """사용자 데이터 버전 증가 (호출한 쪽 트랜잭션과 함께 커밋됨)"""
+    User.query.filter(User.id.in_(user_ids)).update(
+        {User.data_version: User.data_version + 1, User.data_updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+
+
+def conditional_list(kind, user_id, build):
+    """사용자별 목록 응답 - ETag 는 (종류, 사용자, data_version, 쿼리 문자열) 로 계산"""
+    version, updated_at = user_data_version(user_id)
+    etag = make_etag(kind, user_id, version, request.query_string.decode())
+    return conditional_response(etag, updated_at, build)
+
+
+def schedule_detail_response(model, trip_id, user):
+    """일정 상세 조회 (If-None-Match 가 있으면 버전만 먼저 읽어서 비교)"""
+    if request.if_none_match:
+        head = db.session.query(model.id, model.user_id, model.version).filter_by(trip_id=trip_id).first()
+        if head and head.user_id == user.id:
+            matched = matching_etag(make_etag(model.__tablename__, head.id, head.version))
+            if matched:
+                return not_modified_response(matched)
+
+    schedule = model.query.options(*schedule_load_options(model, SCHEDULE_DETAIL_FIELDS)).filter_by(trip_id=trip_id).first()
+    if not schedule:
+        return {"message": "Schedule not found"}, 404
+
+    if schedule.user_id != user.id:
+        return {"message": "Unauthorized access"}, 403
+
+    etag = make_etag(model.__tablename__, schedule.id, schedule.version)
+    return with_validators((serialize_schedule_detail(schedule), 200), etag)
+
+
+# 일정 검색: 단어를 글자 2-gram 으로 나눠 색인 (한국어는 띄어쓰기 / 조사와 무관하게 부분 일치)
+SEARCH_SOURCES = {TravelSchedule: 1, AdditionalTravelSchedule: 2}
+SEARCH_NGRAM = 2
+SEARCH_FIELD_WEIGHTS = (('title', 3), ('keywords', 2), ('summary', 1))  # 제목 일치가 가장 높은 점수
+SEARCH_INDEX_BATCH_SIZE = 500
+_SEARCH_WORD = re.compile(r'\w+')
+
+
+def search_terms(text):
+    """유니코드 정규화 + 대소문자 무시 후 단어별 n-gram 목록 (n 글자 이하 단어는 그대로)"""
+    terms = []
+    for word in _SEARCH_WORD.findall(unicodedata.normalize('NFKC', text).casefold()):
+        if len(word) <= SEARCH_NGRAM:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + SEARCH_NGRAM] for i in range(len(word) - SEARCH_NGRAM + 1))
+    return terms
+
+
+def schedule_term_weights(schedule):
+    """일정의 검색어별 가중치 (필드 가중치 x 등장 횟수)"""
+    weights = Counter()
+    for field, weight in SEARCH_FIELD_WEIGHTS:
+        value = getattr(schedule, field)
+        if isinstance(value, list):
+            value = ' '.join(str(item) for item in value)
+        elif value is not None and not isinstance(value, str):
+            value = str(value)
+        for term in search_terms(value or ''):
+            weights[term] += weight
+    return weights
+
+
+def index_schedules(conn, model, schedules):
+    """일정 (id, user_id, title, keywords, summary) 목록을 검색 색인에 추가 (커밋은 호출한 쪽)"""
+    source = SEARCH_SOURCES[model]
+    rows = [
+        dict(source=source, schedule_id=schedule.id, user_id=schedule.user_id, term=term, weight=weight)
+        for schedule in schedules
+        for term, weight in schedule_term_weights(schedule).items()
+    ]
+    if rows:
+        conn.execute(db.insert(ScheduleSearchTerm), rows)
+
+
+def index_schedules_by_trip_id(conn, model, trip_ids):
+    """executemany 로 등록해 id 를 모르는 일정들을 trip_id 로 다시 읽어 색인"""
+    table = model.__table__
+    schedules = conn.execute(
+        db.select(table.c.id, table.c.user_id, table.c.title, table.c.keywords, table.c.summary)
+        .where(table.c.trip_id.in_(trip_ids))
+    ).all()
+    index_schedules(conn, model, schedules)
+
+
+def unindex_schedules(conn, model, schedule_ids):
+    conn.execute(db.delete(ScheduleSearchTerm).where(
+        ScheduleSearchTerm.source == SEARCH_SOURCES[model],
+        ScheduleSearchTerm.schedule_id.in_(schedule_ids)
+    ))
+
+
+def rebuild_search_index(conn, model, batch_size=SEARCH_INDEX_BATCH_SIZE):
+    """일정 테이블 전체로 검색 색인을 다시 만들고 색인한 일정 수 반환 (커밋은 호출한 쪽)"""
+    table = model.__table__
+    conn.execute(db.delete(ScheduleSearchTerm).where(ScheduleSearchTerm.source == SEARCH_SOURCES[model]))
+    last_id, indexed = 0, 0
+    while True:
+        schedules = conn.execute(
+            db.select(table.c.id, table.c.user_id, table.c.title, table.c.keywords, table.c.summary)
+            .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not schedules:
+            return indexed
+        index_schedules(conn, model, schedules)
+        last_id, indexed = schedules[-1].id, indexed + len(schedules)
+
+
+# 일정 부분 수정 (PATCH): JSON Patch 형식 연산을 필드 / days 의 일부에만 적용
+# API 필드명 -> (컬럼 속성, 종류) - JSON 컬럼만 하위 경로(/days/2/places/0/memo 등) 수정 가능
+SCHEDULE_PATCH_FIELDS = {
+    "title": ('title', 'str'),
+    "companion": ('companion', 'str'),
+    "startDate": ('start_date', 'date'),
+    "endDate": ('end_date', 'date'),
+    "duration": ('duration', 'str'),
+    "budget": ('budget', 'str'),
+    "transportation": ('transportation', 'json'),
+    "keywords": ('keywords', 'json'),
+    "summary": ('summary', 'str'),
+    "days": ('days', 'json'),
+    "extraInfo": ('extra_info', 'json'),
+    "generatedScheduleRaw": ('generated_schedule_raw', 'str'),
+}
+SCHEDULE_PATCH_OPS = ('add', 'remove', 'replace', 'test')
+SCHEDULE_PATCH_MAX_OPS = int(os.getenv('SCHEDULE_PATCH_MAX_OPS', 100))
+SCHEDULE_PATCH_STAR_RETRIES = int(os.getenv('SCHEDULE_PATCH_STAR_RETRIES', 10))  # If-Match: * 요청이 동시 수정과 겹쳤을 때 다시 시도할 횟수
+
+
+class PatchError(ValueError):
+    pass
+
+
+class PatchTestFailed(PatchError):
+    pass
+
+
+def parse_json_pointer(path):
+    """'/days/2/places/0' -> ['days', '2', 'places', '0'] (~1 은 /, ~0 은 ~)"""
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise PatchError(f"Invalid path: {path!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in path[1:].split('/')]
+
+
+def _patch_index(container, token, path, allow_end=False):
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise PatchError(f"Invalid array index in {path}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Index out of range in {path}")
+    return index
+
+
+def apply_json_patch_op(document, tokens, op, value, path):
+    """document 안의 tokens 위치에 연산 하나를 적용하고 (루트가 바뀔 수 있으므로) 문서를 반환"""
+    if not tokens:
+        if op == 'test':
+            if document != value:
+                raise PatchTestFailed(f"Test failed at {path}")
+            return document
+        return None if op == 'remove' else value
+
+    parent = document
+    for token in tokens[:-1]:
+        try:
+            parent = parent[_patch_index(parent, token, path)] if isinstance(parent, list) else parent[token]
+        except (KeyError, TypeError):
+            raise PatchError(f"Path not found: {path}")
+
+    last = tokens[-1]
+    if isinstance(parent, list):
+        index = _patch_index(parent, last, path, allow_end=op == 'add')
+        if op == 'add':
+            parent.insert(index, value)
+        elif op == 'remove':
+            del parent[index]
+        elif op == 'replace':
+            parent[index] = value
+        elif parent[index] != value:
+            raise PatchTestFailed(f"Test failed at {path}")
+    elif isinstance(parent, dict):
+        if op != 'add' and last not in parent:
+            raise PatchError(f"Path not found: {path}")
+        if op == 'remove':
+            del parent[last]
+        elif op == 'test':
+            if parent[last] != value:
+                raise PatchTestFailed(f"Test failed at {path}")
+        else:
+            parent[last] = value
+    else:
+        raise PatchError(f"Path not found: {path}")
+    return document
+
+
+def patch_field_value(model, field, kind, value, op, path):
+    """문자열 / 날짜 필드 값 검증 (필드 전체 교체만 가능)"""
+    attr = SCHEDULE_PATCH_FIELDS[field][0]
+    if op == 'remove' or value is None:
+        if op != 'test' and not model.__table__.c[attr].nullable:
+            raise PatchError(f"{field} cannot be removed")
+        return None
+    if kind == 'date':
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            raise PatchError(f"{path} must be a YYYY-MM-DD date")
+    if not isinstance(value, str):
+        raise PatchError(f"{path} must be a string")
+    return value
+
+
+def parse_patch_ops(body):
+    """요청 본문 (JSON Patch 배열) -> [(op, API 필드명, 하위 tokens, value, path)]"""
+    if not isinstance(body, list) or not body:
+        raise PatchError("Body must be a non-empty JSON Patch array")
+    if len(body) > SCHEDULE_PATCH_MAX_OPS:
+        raise PatchError(f"Too many operations (max {SCHEDULE_PATCH_MAX_OPS})")
+    ops = []
+    for operation in body:
+        if not isinstance(operation, dict) or operation.get('op') not in SCHEDULE_PATCH_OPS:
+            raise PatchError(f"op must be one of: {', '.join(SCHEDULE_PATCH_OPS)}")
+        op, path = operation['op'], operation.get('path')
+        tokens = parse_json_pointer(path)
+        field = tokens[0]
+        if field not in SCHEDULE_PATCH_FIELDS:
+            raise PatchError(f"{path} cannot be patched")
+        if len(tokens) > 1 and SCHEDULE_PATCH_FIELDS[field][1] != 'json':
+            raise PatchError(f"{field} can only be replaced as a whole")
+        if op != 'remove' and 'value' not in operation:
+            raise PatchError(f"value is required for {op} {path}")
+        ops.append((op, field, tokens[1:], operation.get('value'), path))
+    return ops
+
+
+def if_match_satisfied(etag):
+    """If-Match 가 현재 ETag (또는 압축 응답용 변형) 와 일치하는지"""
+    if request.if_match.star_tag:
+        return True
+    return any(request.if_match.contains(candidate)
+               for candidate in [etag] + [f'{etag}-{encoding}' for encoding in COMPRESS_ENCODINGS])
+
+
+def patch_schedule_response(model, trip_id, user):
+    """일정 부분 수정 - If-Match (ETag) 또는 ?version= 으로 낙관적 동시성 검사
+
+    바뀐 컬럼만 읽고 UPDATE ... WHERE version = ? 로 쓰므로 generated_schedule_raw 처럼
+    건드리지 않은 큰 컬럼은 읽지도 쓰지도 않음
+    """
+    expected_version = request.args.get('version')
+    if not request.if_match and expected_version is None:
+        return {"message": "If-Match or version is required"}, 428
+
+    try:
+        ops = parse_patch_ops(request.get_json(silent=True))
+    except PatchError as e:
+        return {"message": str(e)}, 400
+
+    # If-Match: * 는 버전과 무관하므로 동시에 다른 요청이 먼저 고쳤으면 다시 읽어서 적용
+    attempts = 1 + (SCHEDULE_PATCH_STAR_RETRIES if request.if_match.star_tag and expected_version is None else 0)
+    for _ in range(attempts):
+        response = apply_schedule_patch(model, trip_id, user, ops, expected_version)
+        if response is not None:
+            return response
+    return {"message": "Schedule was modified"}, 412
+
+
+def apply_schedule_patch(model, trip_id, user, ops, expected_version):
+    """patch_schedule_response 의 한 번 시도 - 쓰는 사이 다른 요청이 버전을 올렸으면 None"""
+    fields = {field for _, field, _, _, _ in ops}
+    if fields & {field for field, _ in SEARCH_FIELD_WEIGHTS}:
+        fields |= {field for field, _ in SEARCH_FIELD_WEIGHTS}  # 검색 색인을 다시 만들 때 필요
+    if fields & {'startDate', 'endDate'}:
+        fields |= {'startDate', 'endDate'}  # 바뀐 기간이 뒤집히지 않았는지 확인할 때 필요
+    attrs = {'id', 'user_id', 'version'} | {SCHEDULE_PATCH_FIELDS[field][0] for field in fields}
+    schedule = model.query.options(load_only(*[getattr(model, attr) for attr in attrs], raiseload=True)) \
+        .filter_by(trip_id=trip_id).first()
+    if not schedule:
+        return {"message": "Schedule not found"}, 404
+    if schedule.user_id != user.id:
+        return {"message": "Unauthorized access"}, 403
+
+    etag = make_etag(model.__tablename__, schedule.id, schedule.version)
+    if (request.if_match and not if_match_satisfied(etag)) or \
+            (expected_version is not None and expected_version != str(schedule.version)):
+        return {"message": "Schedule was modified", "version": schedule.version}, 412, {'ETag': quote_etag(etag)}
+
+    # 필드별 현재 값의 복사본에 연산을 순서대로 적용
+    values = {}
+    try:
+        for op, field, tokens, value, path in ops:
+            attr, kind = SCHEDULE_PATCH_FIELDS[field]
+            current = values[field] if field in values else copy.deepcopy(getattr(schedule, attr))
+            if kind == 'json':
+                values[field] = apply_json_patch_op(current, tokens, op, value, path)
+            else:
+                value = patch_field_value(model, field, kind, value, op, path)
+                if op == 'test':
+                    if current != value:
+                        raise PatchTestFailed(f"Test failed at {path}")
+                    values[field] = current
+                else:
+                    values[field] = value
+    except PatchTestFailed as e:
+        return {"message": str(e)}, 409
+    except PatchError as e:
+        return {"message": str(e)}, 400
+    if values.get('days', []) is None:
+        return {"message": "days cannot be removed"}, 400
+    if 'startDate' in fields and \
+            values.get('startDate', schedule.start_date) > values.get('endDate', schedule.end_date):
+        return {"message": "startDate must not be after endDate"}, 400
+
+    changed = {field: value for field, value in values.items()
+               if value != getattr(schedule, SCHEDULE_PATCH_FIELDS[field][0])}
+    if changed:
+        try:
+            for field, value in changed.items():
+                setattr(schedule, SCHEDULE_PATCH_FIELDS[field][0], value)
+            db.session.flush()
+            if changed.keys() & {field for field, _ in SEARCH_FIELD_WEIGHTS}:
+                unindex_schedules(db.session, model, [schedule.id])
+                index_schedules(db.session, model, [schedule])
+            bump_user_version(user.id)
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return None
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"message": str(getattr(e, 'orig', None) or e)}, 400
+
+    etag = make_etag(model.__tablename__, schedule.id, schedule.version)
+    return {"message": "Schedule updated successfully", "version": schedule.version,
+            "updated": sorted(changed)}, 200, {'ETag': quote_etag(etag)}
+
+
+# /schedule/<trip_id> 와 같은 위치에 등록된 컬렉션 경로 (이 tripId 로 만든 일정은 조회 / 수정 / 삭제할 수 없음)
+RESERVED_TRIP_IDS = ('bulk', 'search', 'batch')
+
+
+def parse_schedule(data, user_id):
+    """요청 JSON 을 일정 모델 컬럼 값으로 변환 (필수 필드 누락 / 날짜 형식 오류 / 예약된 tripId 시 예외)"""
+    if data['tripId'] in RESERVED_TRIP_IDS:
+        raise ValueError(f"tripId cannot be one of: {', '.join(RESERVED_TRIP_IDS)}")
+    return dict(
+        user_id=user_id,
+        trip_id=data['tripId'],
+        timestamp=datetime.strptime(data['timestamp'], "%Y-%m-%dT%H:%M:%S.%fZ"),
+        title=data['title'],
+        companion=data.get('companion'),
+        start_date=datetime.strptime(data['startDate'], "%Y-%m-%d").date(),
+        end_date=datetime.strptime(data['endDate'], "%Y-%m-%d").date(),
+        duration=data['duration'],
+        budget=data.get('budget'),
+        transportation=data.get('transportation', []),
+        keywords=data.get('keywords', []),
+        summary=data.get('summary'),
+        days=data['days'],
+        extra_info=data.get('extraInfo', {}),
+        generated_schedule_raw=data.get('generatedScheduleRaw')
+    )
+
+
+# 일정 일괄 등록 설정
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', 500))  # 한 트랜잭션에 넣을 행 수
+BULK_IMPORT_MAX_ITEMS = int(os.getenv('BULK_IMPORT_MAX_ITEMS', 10000))  # HTTP 요청 한 번에 받을 최대 일정 수
+
+
+def read_bulk_items(lines_or_text, ndjson):
+    """JSON 배열 또는 NDJSON 본문을 일정 목록으로 변환"""
+    if ndjson:
+        lines = lines_or_text.splitlines() if isinstance(lines_or_text, str) else lines_or_text
+        return [json.loads(line) for line in lines if line.strip()]
+    items = json.loads(lines_or_text)
+    if not isinstance(items, list):
+        raise ValueError("Body must be a JSON array of schedules")
+    return items
+
+
+def import_schedules(model, items, chunk_size=BULK_IMPORT_CHUNK_SIZE):
+    """일정 여러 건을 검증 후 executemany 로 나눠서 INSERT
+
+    반환값: (등록된 행 수, [{"index", "tripId", "message"}, ...])
+    """
+    errors = []
+
+    # 사용자는 한 번의 쿼리로 조회
+    usernames = {item.get('username') for item in items if isinstance(item, dict)}
+    usernames.discard(None)
+    user_ids = dict(
+        db.session.query(User.username, User.id).filter(User.username.in_(usernames)).all()
+    ) if usernames else {}
+
+    # 전체 항목을 먼저 검증
+    rows, seen_trip_ids = [], set()
+    for index, item in enumerate(items):
+        trip_id = item.get('tripId') if isinstance(item, dict) else None
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Schedule must be a JSON object")
+            user_id = user_ids.get(item.get('username'))
+            if user_id is None:
+                raise LookupError("User not found")
+            if trip_id in seen_trip_ids:
+                raise ValueError("Duplicate tripId in request")
+            row = parse_schedule(item, user_id)
+        except Exception as e:
+            errors.append({"index": index, "tripId": trip_id, "message": str(e)})
+            continue
+        seen_trip_ids.add(trip_id)
+        rows.append((index, row))
+
+    inserted = 0
+    insert_stmt = db.insert(model)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            db.session.execute(insert_stmt, [row for _, row in chunk])
+            index_schedules_by_trip_id(db.session, model, [row['trip_id'] for _, row in chunk])
+            bump_user_version(*{row['user_id'] for _, row in chunk})
+            db.session.commit()
+            inserted += len(chunk)
+            continue
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        # 묶음 INSERT 가 실패하면 (예: 이미 있는 tripId) 한 건씩 다시 넣어 실패한 항목만 보고
+        for index, row in chunk:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert_stmt, [row])
+                    index_schedules_by_trip_id(db.session, model, [row['trip_id']])
+                bump_user_version(row['user_id'])
+                inserted += 1
+            except SQLAlchemyError as e:
+                errors.append({"index": index, "tripId": row['trip_id'], "message": str(getattr(e, 'orig', None) or e)})
+        db.session.commit()
+
+    errors.sort(key=lambda error: error['index'])
+    return inserted, errors
+
 
 class TravelScheduleResource(Resource):
     def post(self):
         data = request.get_json()
         username = data.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
         try:
-            new_schedule = TravelSchedule(
-                user_id=user.id,
-                trip_id=data['tripId'],
-                timestamp=datetime.strptime(data['timestamp'], "%Y-%m-%dT%H:%M:%S.%fZ"),
-                title=data['title'],
-                companion=data.get('companion'),
-                start_date=datetime.strptime(data['startDate'], "%Y-%m-%d").date(),
-                end_date=datetime.strptime(data['endDate'], "%Y-%m-%d").date(),
-                duration=data['duration'],
-                budget=data.get('budget'),
-                transportation=json.dumps(data.get('transportation', [])),
-                keywords=json.dumps(data.get('keywords', [])),
-                summary=data.get('summary'),
-                days=json.dumps(data['days']),
-                extra_info=json.dumps(data.get('extraInfo', {})),
-                generated_schedule_raw=data.get('generatedScheduleRaw')
-            )
+            new_schedule = TravelSchedule(**parse_schedule(data, user.id))
             db.session.add(new_schedule)
+            db.session.flush()
+            index_schedules(db.session, TravelSchedule, [new_schedule])
+            bump_user_version(user.id)
+            # 커밋 뒤 속성을 다시 읽다 실패해도 저장된 일정이 400 으로 보이지 않도록 응답을 먼저 만듦
+            response = {"message": "Travel schedule created successfully", "schedule_id": new_schedule.id}, 201
             db.session.commit()
-            return {"message": "Travel schedule created successfully", "schedule_id": new_schedule.id}, 201
+            return response
         except Exception as e:
+            db.session.rollback()
             return {"message": str(e)}, 400
 
     def get(self):
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        schedules = TravelSchedule.query.filter_by(user_id=user.id).all()
-        return [{
-            "id": schedule.id,
-            "tripId": schedule.trip_id,
-            "timestamp": schedule.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "title": schedule.title,
-            "companion": schedule.companion,
-            "startDate": schedule.start_date.strftime("%Y-%m-%d"),
-            "endDate": schedule.end_date.strftime("%Y-%m-%d"),
-            "duration": schedule.duration,
-            "budget": schedule.budget,
-            "transportation": json.loads(schedule.transportation),
-            "keywords": json.loads(schedule.keywords),
-            "summary": schedule.summary,
-            "days": json.loads(schedule.days),
-            "extraInfo": json.loads(schedule.extra_info),
-            "generatedScheduleRaw": schedule.generated_schedule_raw
-        } for schedule in schedules], 200
+        try:
+            fields = requested_schedule_fields()
+            query = apply_date_range(TravelSchedule.query.filter_by(user_id=user.id), TravelSchedule)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        query = query.options(*schedule_load_options(TravelSchedule, fields))
+        serialize = make_schedule_serializer(fields)
+        return conditional_list(TravelSchedule.__tablename__, user.id, lambda: list_response(
+            query, TravelSchedule, serialize, orders=('id', 'timestamp')
+        ))
 
 class TravelScheduleDetailResource(Resource):
     def get(self, trip_id):  # schedule_id → trip_id
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        schedule = TravelSchedule.query.filter_by(trip_id=trip_id).first()  # trip_id로 조회
-        if not schedule:
-            return {"message": "Schedule not found"}, 404
+        return schedule_detail_response(TravelSchedule, trip_id, user)
 
-        if schedule.user_id != user.id:
-            return {"message": "Unauthorized access"}, 403
+    def patch(self, trip_id):
+        username = request.args.get('username')
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
 
-        return {
-            "tripId": schedule.trip_id,
-            "timestamp": schedule.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "title": schedule.title,
-            "companion": schedule.companion,
-            "startDate": schedule.start_date.strftime("%Y-%m-%d"),
-            "endDate": schedule.end_date.strftime("%Y-%m-%d"),
-            "duration": schedule.duration,
-            "budget": schedule.budget,
-            "transportation": json.loads(schedule.transportation),
-            "keywords": json.loads(schedule.keywords),
-            "summary": schedule.summary,
-            "days": json.loads(schedule.days),
-            "extraInfo": json.loads(schedule.extra_info),
-            "generatedScheduleRaw": schedule.generated_schedule_raw
-        }, 200
+        return patch_schedule_response(TravelSchedule, trip_id, user)
 
     def delete(self, trip_id):  # schedule_id → trip_id
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
@@ -362,7 +1662,9 @@ class TravelScheduleDetailResource(Resource):
             return {"message": "Unauthorized access"}, 403
 
         try:
+            unindex_schedules(db.session, TravelSchedule, [schedule.id])
             db.session.delete(schedule)
+            bump_user_version(user.id)
             db.session.commit()
             return {"message": "Travel schedule deleted successfully"}, 200
         except Exception as e:
@@ -374,93 +1676,62 @@ class AdditionalTravelScheduleResource(Resource):
     def post(self):
         data = request.get_json()
         username = data.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
         try:
-            new_schedule = AdditionalTravelSchedule(
-                user_id=user.id,
-                trip_id=data['tripId'],
-                timestamp=datetime.strptime(data['timestamp'], "%Y-%m-%dT%H:%M:%S.%fZ"),
-                title=data['title'],
-                companion=data.get('companion'),
-                start_date=datetime.strptime(data['startDate'], "%Y-%m-%d").date(),
-                end_date=datetime.strptime(data['endDate'], "%Y-%m-%d").date(),
-                duration=data['duration'],
-                budget=data.get('budget'),
-                transportation=json.dumps(data.get('transportation', [])),
-                keywords=json.dumps(data.get('keywords', [])),
-                summary=data.get('summary'),
-                days=json.dumps(data['days']),
-                extra_info=json.dumps(data.get('extraInfo', {})),
-                generated_schedule_raw=data.get('generatedScheduleRaw')
-            )
+            new_schedule = AdditionalTravelSchedule(**parse_schedule(data, user.id))
             db.session.add(new_schedule)
+            db.session.flush()
+            index_schedules(db.session, AdditionalTravelSchedule, [new_schedule])
+            bump_user_version(user.id)
+            # 커밋 뒤 속성을 다시 읽다 실패해도 저장된 일정이 400 으로 보이지 않도록 응답을 먼저 만듦
+            response = {"message": "Additional travel schedule created successfully", "schedule_id": new_schedule.id}, 201
             db.session.commit()
-            return {"message": "Additional travel schedule created successfully", "schedule_id": new_schedule.id}, 201
+            return response
         except Exception as e:
+            db.session.rollback()
             return {"message": str(e)}, 400
 
     def get(self):
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        schedules = AdditionalTravelSchedule.query.filter_by(user_id=user.id).all()
-        return [{
-            "id": schedule.id,
-            "tripId": schedule.trip_id,
-            "timestamp": schedule.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "title": schedule.title,
-            "companion": schedule.companion,
-            "startDate": schedule.start_date.strftime("%Y-%m-%d"),
-            "endDate": schedule.end_date.strftime("%Y-%m-%d"),
-            "duration": schedule.duration,
-            "budget": schedule.budget,
-            "transportation": json.loads(schedule.transportation),
-            "keywords": json.loads(schedule.keywords),
-            "summary": schedule.summary,
-            "days": json.loads(schedule.days),
-            "extraInfo": json.loads(schedule.extra_info),
-            "generatedScheduleRaw": schedule.generated_schedule_raw
-        } for schedule in schedules], 200
+        try:
+            fields = requested_schedule_fields()
+            query = apply_date_range(AdditionalTravelSchedule.query.filter_by(user_id=user.id), AdditionalTravelSchedule)
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        query = query.options(*schedule_load_options(AdditionalTravelSchedule, fields))
+        serialize = make_schedule_serializer(fields)
+        return conditional_list(AdditionalTravelSchedule.__tablename__, user.id, lambda: list_response(
+            query, AdditionalTravelSchedule, serialize, orders=('id', 'timestamp')
+        ))
 
 class AdditionalTravelScheduleDetailResource(Resource):
     def get(self, trip_id):
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        schedule = AdditionalTravelSchedule.query.filter_by(trip_id=trip_id).first()
-        if not schedule:
-            return {"message": "Schedule not found"}, 404
+        return schedule_detail_response(AdditionalTravelSchedule, trip_id, user)
 
-        if schedule.user_id != user.id:
-            return {"message": "Unauthorized access"}, 403
+    def patch(self, trip_id):
+        username = request.args.get('username')
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
 
-        return {
-            "tripId": schedule.trip_id,
-            "timestamp": schedule.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "title": schedule.title,
-            "companion": schedule.companion,
-            "startDate": schedule.start_date.strftime("%Y-%m-%d"),
-            "endDate": schedule.end_date.strftime("%Y-%m-%d"),
-            "duration": schedule.duration,
-            "budget": schedule.budget,
-            "transportation": json.loads(schedule.transportation),
-            "keywords": json.loads(schedule.keywords),
-            "summary": schedule.summary,
-            "days": json.loads(schedule.days),
-            "extraInfo": json.loads(schedule.extra_info),
-            "generatedScheduleRaw": schedule.generated_schedule_raw
-        }, 200
+        return patch_schedule_response(AdditionalTravelSchedule, trip_id, user)
 
     def delete(self, trip_id):
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
@@ -472,13 +1743,607 @@ class AdditionalTravelScheduleDetailResource(Resource):
             return {"message": "Unauthorized access"}, 403
 
         try:
+            unindex_schedules(db.session, AdditionalTravelSchedule, [schedule.id])
             db.session.delete(schedule)
+            bump_user_version(user.id)
             db.session.commit()
             return {"message": "Additional travel schedule deleted successfully"}, 200
         except Exception as e:
             db.session.rollback()
             return {"message": f"An error occurred while deleting the schedule: {str(e)}"}, 500
 
+class ScheduleBulkImportResource(Resource):
+    """일정 일괄 등록 (JSON 배열 또는 application/x-ndjson 본문)"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def post(self):
+        try:
+            items = read_bulk_items(request.get_data(as_text=True), request.mimetype == 'application/x-ndjson')
+        except ValueError as e:
+            return {"message": f"Invalid body: {e}"}, 400
+
+        if not items:
+            return {"message": "No schedules to import"}, 400
+        if len(items) > BULK_IMPORT_MAX_ITEMS:
+            return {"message": f"Too many schedules (max {BULK_IMPORT_MAX_ITEMS})"}, 413
+
+        inserted, errors = import_schedules(self.model, items)
+        return {"inserted": inserted, "failed": len(errors), "errors": errors}, 201 if not errors else 207
+
+
+SCHEDULE_BATCH_MAX_IDS = int(os.getenv('SCHEDULE_BATCH_MAX_IDS', 100))  # 한 번에 조회할 최대 trip_id 수
+
+
+class ScheduleBatchResource(Resource):
+    """trip_id 여러 개를 한 번의 쿼리로 조회 (?ids=a,b,c)
+
+    요청한 순서대로 schedules 에 담고, 없거나 다른 사용자의 일정은 errors 에 tripId 별로
+    상세 조회와 같은 상태 코드 / 메시지로 반환 (하나라도 있으면 207). fields / view 는 목록 API 와 같음.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def get(self):
+        username = request.args.get('username')
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
+
+        trip_ids = list(dict.fromkeys(
+            trip_id.strip() for trip_id in request.args.get('ids', '').split(',') if trip_id.strip()
+        ))
+        if not trip_ids:
+            return {"message": "ids must contain at least one trip_id"}, 400
+        if len(trip_ids) > SCHEDULE_BATCH_MAX_IDS:
+            return {"message": f"Too many ids (max {SCHEDULE_BATCH_MAX_IDS})"}, 413
+        try:
+            fields = requested_schedule_fields() if 'view' in request.args or 'fields' in request.args \
+                else SCHEDULE_DETAIL_FIELDS
+        except ValueError as e:
+            return {"message": str(e)}, 400
+
+        return conditional_list(f'{self.model.__tablename__}_batch', user.id,
+                                lambda: self.lookup(user.id, trip_ids, fields))
+
+    def lookup(self, user_id, trip_ids, fields):
+        # trip_id 유니크 인덱스로 한 번에 조회한 뒤 소유자는 행마다 확인
+        schedules = {
+            schedule.trip_id: schedule
+            for schedule in self.model.query.options(*schedule_load_options(self.model, fields + ('tripId',)))
+            .filter(self.model.trip_id.in_(trip_ids))
+        }
+        serialize = make_schedule_serializer(fields)
+        found, errors = [], []
+        for trip_id in trip_ids:
+            schedule = schedules.get(trip_id)
+            if schedule is None:
+                errors.append({"tripId": trip_id, "status": 404, "message": "Schedule not found"})
+            elif schedule.user_id != user_id:
+                errors.append({"tripId": trip_id, "status": 403, "message": "Unauthorized access"})
+            else:
+                found.append(serialize(schedule))
+        return {"schedules": found, "errors": errors}, 200 if not errors else 207
+
+
+class ScheduleSearchResource(Resource):
+    """사용자 일정 검색 (제목 / 키워드 / 요약)
+
+    검색어의 n-gram 을 모두 포함하는 일정을 점수(가중치 합) 순으로 반환.
+    limit / after 는 다른 목록 API 처럼 keyset 페이지네이션 (X-Next-Cursor), fields / view 도 동일.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def get(self):
+        username = request.args.get('username')
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
+
+        terms = sorted(set(search_terms(request.args.get('q', ''))))
+        if not terms:
+            return {"message": "q must contain at least one letter or digit"}, 400
+        try:
+            fields = requested_schedule_fields()
+            limit = int(request.args.get('limit', DEFAULT_PAGE_LIMIT))
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        if not (1 <= limit <= MAX_PAGE_LIMIT):
+            return {"message": f"limit must be between 1 and {MAX_PAGE_LIMIT}"}, 400
+
+        after = None
+        if request.args.get('after'):
+            try:
+                values = decode_cursor(request.args['after'])
+                after = int(values[0]), int(values[1])
+            except (InvalidCursor, ValueError, TypeError, IndexError, KeyError):
+                return {"message": "Invalid cursor"}, 400
+
+        return conditional_list(f'{self.model.__tablename__}_search', user.id,
+                                lambda: self.search(user.id, terms, fields, limit, after))
+
+    def search(self, user_id, terms, fields, limit, after):
+        # 색인만 읽어서 (일정 id, 점수) 를 구한 뒤 해당 일정만 PK 로 조회
+        term = ScheduleSearchTerm
+        score = db.func.sum(term.weight)
+        matches = (
+            db.select(term.schedule_id, score.label('score'))
+            .where(term.user_id == user_id, term.source == SEARCH_SOURCES[self.model], term.term.in_(terms))
+            .group_by(term.schedule_id)
+            .having(db.func.count() == len(terms))
+        )
+        if after:
+            last_score, last_id = after
+            matches = matches.having(or_(score < last_score, and_(score == last_score, term.schedule_id < last_id)))
+        matches = db.session.execute(
+            matches.order_by(score.desc(), term.schedule_id.desc()).limit(limit + 1)
+        ).all()
+
+        headers = {}
+        if len(matches) > limit:
+            matches = matches[:limit]
+            headers['X-Next-Cursor'] = encode_cursor([matches[-1].score, matches[-1].schedule_id])
+
+        ids = [match.schedule_id for match in matches]
+        schedules = {
+            schedule.id: schedule
+            for schedule in self.model.query.options(*schedule_load_options(self.model, fields))
+            .filter(self.model.id.in_(ids))
+        } if ids else {}
+        serialize = make_schedule_serializer(fields)
+        return [serialize(schedules[schedule_id]) for schedule_id in ids if schedule_id in schedules], 200, headers
+
+
+# 사용자 데이터 내보내기 / 가져오기 (NDJSON, 한 줄에 {"type", "data"} 하나)
+# 백업 / 계정 삭제 요청용 - 일정 시각은 다시 가져올 수 있도록 마이크로초까지 기록
+EXPORT_FORMAT_VERSION = 1
+EXPORT_CHUNK_SIZE = 64 * 1024  # HTTP 응답으로 한 번에 내보낼 바이트 수
+EXPORT_SCHEDULE_FIELDS = tuple(name for name in SCHEDULE_FIELDS if name != 'id')
+EXPORT_SCHEDULE_MODELS = {'schedule': TravelSchedule, 'additional_schedule': AdditionalTravelSchedule}
+
+export_schedule = RowSerializer(
+    (name, 'timestamp', 'timestamp_us') if name == 'timestamp' else (name,) + SCHEDULE_FIELDS[name]
+    for name in EXPORT_SCHEDULE_FIELDS
+)
+export_photo = RowSerializer([
+    ("photoUri", 'photo_uri', 'str'),
+    ("location", 'location', 'str'),
+    ("timestamp", 'timestamp', 'timestamp_us'),
+])
+
+
+def export_user_lines(user_id, include_credentials=False):
+    """사용자 데이터를 NDJSON 한 줄씩 생성
+
+    테이블마다 yield_per 로 STREAM_BATCH_SIZE 행씩 서버 측 커서에서 읽으므로 데이터 양과 무관하게 메모리 사용량 일정
+    """
+    user = db.session.get(User, user_id)
+    yield dumps_json({
+        "type": "export", "version": EXPORT_FORMAT_VERSION, "username": user.username,
+        "exportedAt": datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+    }) + '\n'
+    profile = user_profile(user)
+    if include_credentials:
+        profile['passwordHash'] = user.password_hash
+    yield dumps_json({"type": "user", "data": profile}) + '\n'
+
+    for kind, model in EXPORT_SCHEDULE_MODELS.items():
+        query = model.query.options(*schedule_load_options(model, EXPORT_SCHEDULE_FIELDS)) \
+            .filter_by(user_id=user_id).order_by(model.id)
+        for schedule in query.yield_per(STREAM_BATCH_SIZE):
+            yield dumps_json({"type": kind, "data": export_schedule(schedule)}) + '\n'
+
+    photos = Photo.query.options(load_only(Photo.id, Photo.photo_uri, Photo.location, Photo.timestamp)) \
+        .filter_by(user_id=user_id).order_by(Photo.id)
+    for photo in photos.yield_per(STREAM_BATCH_SIZE):
+        yield dumps_json({"type": "photo", "data": export_photo(photo)}) + '\n'
+
+
+def chunk_lines(lines, size=EXPORT_CHUNK_SIZE):
+    """작은 줄들을 size 바이트 정도씩 묶어서 내보냄 (응답 / 압축 호출 횟수 감소)"""
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def import_target_user(username, profile, create_user):
+    """가져올 대상 사용자 - 없으면 create_user 이고 passwordHash 가 있을 때만 생성"""
+    user = get_user(username)
+    if user is not None:
+        return user
+    if not (create_user and profile and profile.get('passwordHash')):
+        raise LookupError(f"User not found: {username}")
+    new_user = User(
+        username=username,
+        password_hash=profile['passwordHash'],
+        nickname=profile.get('nickname'),
+        birthyear=profile.get('birthyear'),
+        gender=profile.get('gender'),
+        marketing_consent=bool(profile.get('marketing_consent')),
+    )
+    new_user.set_preferences(profile.get('preferences') or [])
+    new_user.set_music_genres(profile.get('music_genres') or [])
+    db.session.add(new_user)
+    db.session.commit()
+    return get_user(username)
+
+
+def import_photos(user_id, items):
+    """사진 여러 건을 executemany 로 등록 (같은 사진 URI / 시각이 이미 있으면 건너뜀)
+
+    반환값: (등록된 행 수, [{"index", "message"}, ...])
+    """
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, parse_photo(item, user_id)))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            errors.append({"index": index, "message": f"Invalid photo: {e}"})
+
+    # (user_id, timestamp) 인덱스로 이미 있는 사진 확인 - 같은 파일을 다시 가져와도 중복되지 않음
+    existing = set(db.session.query(Photo.photo_uri, Photo.timestamp).filter(
+        Photo.user_id == user_id, Photo.timestamp.in_({row['timestamp'] for _, row in rows})
+    )) if rows else set()
+    new_rows = [row for _, row in rows if (row['photo_uri'], row['timestamp']) not in existing]
+    if new_rows:
+        db.session.execute(db.insert(Photo), new_rows)
+        bump_user_version(user_id)
+        db.session.commit()
+    return len(new_rows), errors
+
+
+def import_user_lines(lines, username=None, create_user=False, batch_size=BULK_IMPORT_CHUNK_SIZE):
+    """export_user_lines 형식의 NDJSON 을 한 줄씩 읽으며 종류별로 batch_size 줄씩 등록
+
+    username 을 주면 파일의 사용자 대신 그 사용자에게 등록.
+    반환값: {"schedule": n, "additional_schedule": n, "photo": n, "errors": [{"line", "message"}, ...]}
+    """
+    result = {kind: 0 for kind in (*EXPORT_SCHEDULE_MODELS, 'photo')}
+    errors = []
+    pending = {kind: [] for kind in result}  # 종류별 (줄 번호, data)
+    state = {'username': username, 'profile': None, 'user': None}
+
+    def target_user():
+        if state['user'] is None:
+            if not state['username']:
+                raise LookupError("No username in export header")
+            state['user'] = import_target_user(state['username'], state['profile'], create_user)
+        return state['user']
+
+    def flush(kind):
+        batch, pending[kind] = pending[kind], []
+        if not batch:
+            return
+        user = target_user()
+        if kind == 'photo':
+            inserted, batch_errors = import_photos(user.id, [data for _, data in batch])
+        else:
+            items = [dict(data, username=user.username) if isinstance(data, dict) else data for _, data in batch]
+            inserted, batch_errors = import_schedules(EXPORT_SCHEDULE_MODELS[kind], items, batch_size)
+        result[kind] += inserted
+        errors.extend({"line": batch[error['index']][0], "message": error['message']} for error in batch_errors)
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            kind = record['type']
+        except (ValueError, TypeError, KeyError) as e:
+            errors.append({"line": line_number, "message": f"Invalid line: {e}"})
+            continue
+
+        if kind == 'export':
+            if record.get('version') != EXPORT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported export version: {record.get('version')}")
+            state['username'] = state['username'] or record.get('username')
+        elif kind == 'user':
+            state['profile'] = record.get('data')
+        elif kind in pending:
+            pending[kind].append((line_number, record.get('data')))
+            if len(pending[kind]) >= batch_size:
+                flush(kind)
+        else:
+            errors.append({"line": line_number, "message": f"Unknown type: {kind}"})
+
+    for kind in pending:
+        flush(kind)
+    target_user()  # 데이터가 없는 파일이라도 대상 사용자는 확인
+    result['errors'] = errors
+    return result
+
+
+def open_ndjson_stream(stream, content_encoding=None):
+    """바이트 스트림을 줄 단위 텍스트로 (gzip 이면 풀면서) 읽음"""
+    if content_encoding == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+class UserExportResource(Resource):
+    def get(self, username):
+        """사용자 데이터 NDJSON 스트리밍 (Accept-Encoding: gzip 이면 압축해서 전송)"""
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
+
+        lines = export_user_lines(user.id)
+        response = Response(stream_with_context(chunk_lines(lines)), mimetype='application/x-ndjson')
+        response.headers['Content-Disposition'] = f'attachment; filename="{quote_plus(username)}.ndjson"'
+        return response
+
+
+class UserImportResource(Resource):
+    def post(self, username):
+        """내보낸 NDJSON (Content-Encoding: gzip 가능) 을 스트림으로 읽으며 묶음 단위로 등록"""
+        if not get_user(username):
+            return {"message": "User not found"}, 404
+
+        try:
+            lines = open_ndjson_stream(request.stream, request.content_encoding)
+            result = import_user_lines(lines, username=username)
+        except (ValueError, OSError, EOFError) as e:
+            db.session.rollback()
+            return {"message": f"Invalid body: {e}"}, 400
+        return result, 201 if not result['errors'] else 207
+
+
+# 피드백 집계 갱신 / 재계산
+FEEDBACK_STATS_ID = 1
+
+
+def feedback_stats_values(table, rows):
+    """(rating, deduction) 목록만큼 집계 컬럼을 증가시키는 UPDATE 값"""
+    rows = list(rows)
+    values = {
+        table.c.count: table.c.count + len(rows),
+        table.c.rating_sum: table.c.rating_sum + sum(rating for rating, _ in rows),
+        table.c.deduction_sum: table.c.deduction_sum + sum(deduction or 0 for _, deduction in rows),
+        table.c.updated_at: datetime.utcnow(),
+    }
+    for rating in FEEDBACK_RATINGS:
+        matched = sum(1 for value, _ in rows if value == rating)
+        if matched:
+            values[table.c[f'rating_{rating}']] = table.c[f'rating_{rating}'] + matched
+    return values
+
+
+def record_feedback_stats(rows):
+    """새 피드백의 (rating, deduction) 을 집계 행에 반영 (호출한 쪽 트랜잭션과 함께 커밋됨)
+
+    피드백 INSERT 보다 먼저 실행해 집계 행 잠금 -> INSERT 순서를 재계산과 맞춘다.
+    """
+    table = FeedbackStats.__table__
+    update = table.update().where(table.c.id == FEEDBACK_STATS_ID)
+    if db.session.execute(update.values(feedback_stats_values(table, rows))).rowcount == 0:
+        # 집계 행이 없으면 원본 테이블로 만든 뒤 다시 반영
+        rebuild_feedback_stats(db.session)
+        db.session.execute(update.values(feedback_stats_values(table, rows)))
+
+
+def rebuild_feedback_stats(conn):
+    """Feedback 원본 테이블에서 집계를 다시 계산해 저장하고 계산한 값 반환 (커밋은 호출한 쪽)"""
+    table = FeedbackStats.__table__
+    # 집계 행을 먼저 잠가 재계산 도중 등록되는 피드백이 빠지지 않도록 함
+    locked = conn.execute(
+        table.update().where(table.c.id == FEEDBACK_STATS_ID).values(count=table.c.count)
+    ).rowcount
+    feedback = Feedback.__table__
+    columns = [
+        db.func.count(feedback.c.id).label('count'),
+        db.func.coalesce(db.func.sum(feedback.c.rating), 0).label('rating_sum'),
+        db.func.coalesce(db.func.sum(feedback.c.deduction), 0).label('deduction_sum'),
+    ] + [
+        db.func.coalesce(db.func.sum(db.case((feedback.c.rating == rating, 1), else_=0)), 0).label(f'rating_{rating}')
+        for rating in FEEDBACK_RATINGS
+    ]
+    values = dict(conn.execute(db.select(*columns)).one()._mapping, updated_at=datetime.utcnow())
+    if locked:
+        conn.execute(table.update().where(table.c.id == FEEDBACK_STATS_ID).values(values))
+    else:
+        conn.execute(table.insert().values(dict(values, id=FEEDBACK_STATS_ID)))
+    return values
+
+
+def serialize_feedback_stats(stats):
+    count = stats.count
+    return {
+        "count": count,
+        "averageRating": round(stats.rating_sum / count, 2) if count else None,
+        "ratingHistogram": {str(rating): getattr(stats, f'rating_{rating}') for rating in FEEDBACK_RATINGS},
+        "deductionSum": stats.deduction_sum,
+        "averageDeduction": round(stats.deduction_sum / count, 2) if count else None,
+        "updatedAt": stats.updated_at.isoformat(timespec='seconds') + 'Z' if stats.updated_at else None,
+    }
+
+
+# 쓰기 지연 (write-behind): 피드백 / 사진 INSERT 를 버퍼에 모아서 묶음 트랜잭션으로 기록
+WRITE_BEHIND = os.getenv('WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_MAX_ROWS = int(os.getenv('WRITE_BEHIND_MAX_ROWS', 10000))  # 버퍼에 쌓아 둘 수 있는 최대 행 수
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 200))  # 이만큼 모이면 바로 기록
+WRITE_BEHIND_FLUSH_MS = int(os.getenv('WRITE_BEHIND_FLUSH_MS', 200))  # 첫 행이 들어온 뒤 최대 대기 시간
+WRITE_BEHIND_MAX_REQUEUES = int(os.getenv('WRITE_BEHIND_MAX_REQUEUES', 50))  # DB 오류로 다시 넣는 최대 횟수 (기본 간격이면 약 10초)
+WRITE_BEHIND_SHUTDOWN_TIMEOUT = int(os.getenv('WRITE_BEHIND_SHUTDOWN_TIMEOUT', 30))  # 종료 시 남은 행 기록 대기 (초)
+
+
+class WriteBehindFull(Exception):
+    """쓰기 버퍼가 가득 참"""
+
+
+class WriteBehindBuffer:
+    """행을 모아서 N 행 또는 M 밀리초마다 한 트랜잭션으로 INSERT 하는 프로세스 내 버퍼
+
+    writers 는 종류별로 행 목록을 현재 세션에 기록하는 함수 (커밋은 버퍼가 함).
+    DB 연결 오류(OperationalError)는 버퍼 앞에 다시 넣어 max_requeues 번까지 재시도하고, 그 밖의 오류나
+    재시도를 다 쓴 묶음은 한 행씩 다시 넣어 실패한 행만 버림 ("no such table" 처럼 풀리지 않는 오류도
+    OperationalError 이므로 횟수 제한이 없으면 버퍼가 영원히 비지 않음). 기록 스레드는 오류로 멈추지 않음.
+    """
+
+    def __init__(self, writers, max_rows, batch_size, flush_ms, max_requeues):
+        self.writers = writers
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.max_requeues = max_requeues
+        self.app = None
+        self.written = 0
+        self.dropped = 0
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def _reset(self):
+        # fork 된 워커는 부모의 버퍼 / 스레드를 물려받지 않고 새로 시작
+        self._cond = threading.Condition()
+        self._rows = []
+        self._first_at = None
+        self._pending = 0  # 버퍼 + 기록 중인 행 수
+        self._flush_now = False
+        self._closing = False
+        self._thread = None
+
+    @property
+    def retry_after(self):
+        return str(max(1, -(-self.flush_ms // 1000)))
+
+    def init_app(self, app):
+        self.app = app
+
+    def put(self, kind, row):
+        with self._cond:
+            if self._closing or len(self._rows) >= self.max_rows:
+                raise WriteBehindFull()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+            if not self._rows:
+                self._first_at = time.monotonic()
+            self._rows.append((kind, row, 0))  # (종류, 행, 다시 넣은 횟수)
+            self._pending += 1
+            if len(self._rows) == 1 or len(self._rows) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """버퍼에 있는 행을 바로 기록하고 끝날 때까지 대기 (기록이 끝나면 True)"""
+        with self._cond:
+            self._flush_now = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self):
+        """새 행을 받지 않고 남은 행을 모두 기록 (atexit)"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+
+    def _next_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._rows or self._closing)
+            if not self._rows:
+                return None
+            deadline = self._first_at + self.flush_ms / 1000
+            while len(self._rows) < self.batch_size and not (self._closing or self._flush_now):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._rows[:self.batch_size]
+            del self._rows[:self.batch_size]
+            self._first_at = time.monotonic() if self._rows else None
+            self._flush_now = self._flush_now and bool(self._rows)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            with self.app.app_context():
+                written = self._write(batch)
+            with self._cond:
+                self._pending -= written
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        """반환값: 기록했거나 버린 행 수 (재시도할 행은 제외)"""
+        groups = OrderedDict()
+        for kind, row, requeues in batch:
+            rows, most = groups.get(kind, ([], 0))
+            rows.append(row)
+            groups[kind] = (rows, max(most, requeues))
+
+        done = 0
+        for kind, (rows, requeues) in groups.items():
+            writer = self.writers[kind]
+            try:
+                writer(rows)
+                db.session.commit()
+                self.written += len(rows)
+                done += len(rows)
+                continue
+            except OperationalError as e:
+                db.session.rollback()
+                if requeues < self.max_requeues:
+                    # DB 연결 문제는 행을 버리지 않고 버퍼 앞에 다시 넣은 뒤 잠시 쉬고 재시도
+                    current_app.logger.warning("write-behind %s: %d rows requeued: %s", kind, len(rows), e)
+                    with self._cond:
+                        self._rows[:0] = [(kind, row, requeues + 1) for row in rows]
+                        self._first_at = time.monotonic()
+                    time.sleep(self.flush_ms / 1000)
+                    continue
+                current_app.logger.error("write-behind %s: giving up after %d requeues: %s", kind, requeues, e)
+            except Exception:
+                db.session.rollback()
+
+            # 묶음 기록이 실패하면 한 건씩 다시 기록해서 실패한 행만 버림
+            for row in rows:
+                try:
+                    with db.session.begin_nested():
+                        writer([row])
+                    self.written += 1
+                except Exception as e:
+                    self.dropped += 1
+                    current_app.logger.error("write-behind %s: row dropped: %s (%r)", kind, getattr(e, 'orig', None) or e, row)
+            db.session.commit()
+            done += len(rows)
+        return done
+
+
+def write_feedback_rows(rows):
+    record_feedback_stats([(row['rating'], row.get('deduction')) for row in rows])
+    db.session.execute(db.insert(Feedback), rows)
+
+
+def write_photo_rows(rows):
+    db.session.execute(db.insert(Photo), rows)
+    bump_user_version(*{row['user_id'] for row in rows})
+
+
+write_behind = WriteBehindBuffer(
+    {'feedback': write_feedback_rows, 'photo': write_photo_rows},
+    WRITE_BEHIND_MAX_ROWS, WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_FLUSH_MS, WRITE_BEHIND_MAX_REQUEUES
+)
+
+
+def use_write_behind():
+    """쓰기 지연 모드이고 호출한 쪽이 sync=1 (생성된 id 가 필요) 을 요청하지 않았는지"""
+    return WRITE_BEHIND and request.args.get('sync') not in ('1', 'true')
+
+
 # 피드백 추가 API
 class FeedbackResource(Resource):
     def post(self):
@@ -493,8 +2358,16 @@ class FeedbackResource(Resource):
         if deduction and deduction < 0:
             return {"message": "Deduction must be a non-negative number"}, 400
 
+        if use_write_behind():
+            try:
+                write_behind.put('feedback', dict(rating=rating, deduction=deduction, comment=comment))
+            except WriteBehindFull:
+                return {"message": "Server busy, please retry"}, 503, {'Retry-After': write_behind.retry_after}
+            return {"message": "Feedback accepted"}, 202
+
         try:
-            # 새로운 피드백 생성
+            # 집계 갱신 후 새로운 피드백 생성 (같은 트랜잭션)
+            record_feedback_stats([(rating, deduction)])
             new_feedback = Feedback(
                 rating=rating,
                 deduction=deduction,
@@ -504,74 +2377,994 @@ class FeedbackResource(Resource):
             db.session.commit()
             return {"message": "Feedback added successfully", "feedback_id": new_feedback.id}, 201
         except Exception as e:
+            db.session.rollback()
             return {"message": str(e)}, 400
 
     def get(self):
         # 모든 피드백 조회
-        feedbacks = Feedback.query.all()
-        return [{
-            "id": feedback.id,
-            "rating": feedback.rating,
-            "deduction": feedback.deduction,
-            "comment": feedback.comment
-        } for feedback in feedbacks], 200
+        return list_response(Feedback.query, Feedback, serialize_feedback)
+
+class FeedbackStatsResource(Resource):
+    def get(self):
+        # 집계 행 PK 조회 한 번 - 피드백 수와 무관
+        stats = db.session.get(FeedbackStats, FEEDBACK_STATS_ID)
+        if stats is None:
+            stats = FeedbackStats(**rebuild_feedback_stats(db.session))
+            db.session.commit()
+        etag = make_etag('feedback_stats', stats.count, stats.rating_sum, stats.deduction_sum)
+        return conditional_response(etag, stats.updated_at, lambda: (serialize_feedback_stats(stats), 200))
+
+# 사진 API
+PHOTO_ORDERS = ('id', 'timestamp', '-timestamp')
+PHOTO_BATCH_MAX_ITEMS = int(os.getenv('PHOTO_BATCH_MAX_ITEMS', 1000))  # 일괄 등록 한 번에 받을 최대 사진 수
+
+
+def parse_photo(data, user_id):
+    """사진 요청 본문을 Photo 컬럼 값으로 변환 (location_key 는 INSERT 시 기본값으로 채워짐)"""
+    return dict(
+        user_id=user_id,
+        photo_uri=data['photoUri'],
+        location=data.get('location'),
+        timestamp=datetime.strptime(data['timestamp'], "%Y-%m-%dT%H:%M:%S.%fZ")
+    )
+
+
+def parse_time_arg(name):
+    """쿼리 문자열의 ISO 8601 시각 - 타임존이 있으면 UTC 로 변환"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp")
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 class PhotoResource(Resource):
     def post(self):
         data = request.get_json()
         username = data.get('username')
-        photo_uri = data.get('photoUri')
-        location = data.get('location')
-        timestamp = data.get('timestamp')
 
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
+        if use_write_behind():
+            try:
+                write_behind.put('photo', parse_photo(data, user.id))
+            except (KeyError, TypeError, ValueError) as e:
+                return {"message": str(e)}, 400
+            except WriteBehindFull:
+                return {"message": "Server busy, please retry"}, 503, {'Retry-After': write_behind.retry_after}
+            return {"message": "Photo accepted"}, 202
+
         try:
             # 새로운 사진 정보 저장
-            new_photo = Photo(
-                user_id=user.id,
-                photo_uri=photo_uri,
-                location=location,
-                timestamp=datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
-            )
+            new_photo = Photo(**parse_photo(data, user.id))
             db.session.add(new_photo)
+            bump_user_version(user.id)
             db.session.commit()
             return {"message": "Photo saved successfully", "photo_id": new_photo.id}, 201
         except Exception as e:
+            db.session.rollback()
             return {"message": str(e)}, 400
 
     def get(self):
+        """사용자 사진 목록
+
+        - from / to: 촬영 시각 범위 (from 이상, to 미만)
+        - location: 위치 (대소문자 / 공백 / 전각 문자 차이 무시)
+        - order: id, timestamp, -timestamp (최신순) / limit, after, stream 은 다른 목록 API 와 같음
+        """
         username = request.args.get('username')
-        user = User.query.filter_by(username=username).first()
+        user = get_user(username)
         if not user:
             return {"message": "User not found"}, 404
 
-        photos = Photo.query.filter_by(user_id=user.id).all()
-        return [{
-            "id": photo.id,
-            "photoUri": photo.photo_uri,
-            "location": photo.location,
-            "timestamp": photo.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
-        } for photo in photos], 200
-
-# RESTful API 리소스 추가
-api.add_resource(UserRegistration, '/register')
-api.add_resource(UserLogin, '/login')
-api.add_resource(UserProfile, '/user/<string:username>')
-api.add_resource(TravelScheduleResource, '/schedule')  # 전체 일정 조회 및 추가
-api.add_resource(TravelScheduleDetailResource, '/schedule/<string:trip_id>')
-api.add_resource(AdditionalTravelScheduleResource, '/additional_schedule')
-api.add_resource(AdditionalTravelScheduleDetailResource, '/additional_schedule/<string:trip_id>')
-api.add_resource(FeedbackResource, '/feedback')
-api.add_resource(PhotoResource, '/photos')
+        try:
+            since, until = parse_time_arg('from'), parse_time_arg('to')
+        except ValueError as e:
+            return {"message": str(e)}, 400
+        if since and until and since >= until:
+            return {"message": "from must be earlier than to"}, 400
+
+        # (user_id, timestamp) / (user_id, location_key, timestamp) 인덱스 범위 조회
+        query = Photo.query.filter_by(user_id=user.id)
+        if 'location' in request.args:
+            query = query.filter_by(location_key=normalize_location(request.args['location']))
+        if since:
+            query = query.filter(Photo.timestamp >= since)
+        if until:
+            query = query.filter(Photo.timestamp < until)
+
+        return conditional_list(Photo.__tablename__, user.id, lambda: list_response(
+            query, Photo, serialize_photo, orders=PHOTO_ORDERS
+        ))
+
+
+class PhotoBatchResource(Resource):
+    """사진 여러 장을 한 트랜잭션으로 등록 - 하나라도 잘못되면 전체 취소"""
+
+    def post(self):
+        data = request.get_json()
+        username = data.get('username')
+        photos = data.get('photos')
+
+        if not isinstance(photos, list) or not photos:
+            return {"message": "photos must be a non-empty list"}, 400
+        if len(photos) > PHOTO_BATCH_MAX_ITEMS:
+            return {"message": f"Too many photos (max {PHOTO_BATCH_MAX_ITEMS})"}, 413
+
+        user = get_user(username)
+        if not user:
+            return {"message": "User not found"}, 404
+
+        rows, errors = [], []
+        for index, item in enumerate(photos):
+            try:
+                rows.append(parse_photo(item, user.id))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                errors.append({"index": index, "message": f"Invalid photo: {e}"})
+        if errors:
+            return {"message": "No photos were saved", "errors": errors}, 400
+
+        try:
+            # executemany INSERT 한 번 (RETURNING 순서 보장을 요구하면 행마다 INSERT 로 나뉘므로 id 는 돌려주지 않음)
+            db.session.execute(db.insert(Photo), rows)
+            bump_user_version(user.id)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return {"message": str(getattr(e, 'orig', None) or e)}, 400
+        return {"message": "Photos saved successfully", "inserted": len(rows)}, 201
+
+# RawJSON 을 그대로 내보내는 JSON 응답 인코더
+def output_json(data, code, headers=None):
+    response = current_app.response_class(dumps_json(data), status=code, mimetype='application/json')
+    response.headers.extend(headers or {})
+    return response
+
+
+# 요청별 계측 (지연시간 히스토그램, DB 시간 / 쿼리 수, Server-Timing 헤더, /metrics)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+# 워커별 수치를 기록하고 /metrics 에서 합산할 디렉터리 (지정하지 않으면 gunicorn 실행마다 임시 디렉터리)
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1.0))  # 워커 파일 기록 주기 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _process_started(pid):
+    """프로세스 시작 시각 (Linux /proc 의 starttime, 읽을 수 없으면 '') - 재사용된 pid 구분용"""
+    try:
+        with open(f'/proc/{pid}/stat', encoding='utf-8') as f:
+            return f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ''
+
+
+def worker_key(pid):
+    """워커 파일 이름에 쓰는 (pid, 시작 시각) - 같은 pid 의 새 워커가 죽은 워커 수치를 덮어쓰지 않음"""
+    return f'{pid}-{_process_started(pid)}'
+
+
+def worker_alive(key):
+    pid = int(key.split('-', 1)[0])
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return worker_key(pid) == key
+
+
+def metrics_dir():
+    """워커 수치 디렉터리 - METRICS_DIR, gunicorn 워커면 마스터 프로세스(실행)별 임시 디렉터리, 단일 프로세스면 None"""
+    if METRICS_DIR:
+        return METRICS_DIR
+    if 'gunicorn' in sys.modules:
+        return os.path.join(tempfile.gettempdir(), f'app-metrics-{worker_key(os.getppid())}')
+    return None
+
+
+class RequestMetrics:
+    """워커 프로세스의 요청 통계 (스냅샷은 JSON 으로 저장 / 합산 가능)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}  # (endpoint, method, status) -> 요청 수
+            self.latency = {}  # (endpoint, method) -> [버킷별 개수..., 합계, 개수]
+            self.db = {}  # endpoint -> [DB 시간 합계, 쿼리 수]
+
+    def observe(self, endpoint, method, status, duration, db_time, db_queries):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.latency.setdefault((endpoint, method), [0] * (len(LATENCY_BUCKETS) + 2))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    histogram[index] += 1
+            histogram[-2] += duration
+            histogram[-1] += 1
+
+            totals = self.db.setdefault(endpoint, [0.0, 0])
+            totals[0] += db_time
+            totals[1] += db_queries
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": [list(key) + [count] for key, count in self.requests.items()],
+                "latency": [list(key) + [list(values)] for key, values in self.latency.items()],
+                "db": [[endpoint] + list(values) for endpoint, values in self.db.items()],
+                "user_cache": {"hits": user_cache.hits, "misses": user_cache.misses},
+            }
+
+    def maybe_flush(self, force=False):
+        """여러 워커로 실행 중이면 주기적으로 이 워커의 스냅샷을 파일에 기록"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < METRICS_FLUSH_INTERVAL:
+            return
+        directory = metrics_dir()
+        if not directory or not self.requests:  # 요청을 받지 않은 프로세스 (gunicorn --preload 마스터 등)
+            return
+        self._last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'worker-{worker_key(os.getpid())}.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(f'{path}.tmp', path)
+
+
+request_metrics = RequestMetrics()
+
+
+def merge_metric_snapshots(snapshots):
+    requests, latency, db_totals, cache = {}, {}, {}, {"hits": 0, "misses": 0}
+    for snapshot in snapshots:
+        for *key, count in snapshot["requests"]:
+            requests[tuple(key)] = requests.get(tuple(key), 0) + count
+        for endpoint, method, values in snapshot["latency"]:
+            merged = latency.setdefault((endpoint, method), [0] * len(values))
+            for index, value in enumerate(values):
+                merged[index] += value
+        for endpoint, seconds, queries in snapshot["db"]:
+            merged = db_totals.setdefault(endpoint, [0.0, 0])
+            merged[0] += seconds
+            merged[1] += queries
+        for name in cache:
+            cache[name] += snapshot.get("user_cache", {}).get(name, 0)
+    return requests, latency, db_totals, cache
+
+
+def merged_snapshot(snapshots):
+    """여러 스냅샷을 합친 스냅샷 (죽은 워커 수치 보관용)"""
+    requests, latency, db_totals, cache = merge_metric_snapshots(snapshots)
+    return {
+        "requests": [list(key) + [count] for key, count in requests.items()],
+        "latency": [list(key) + [values] for key, values in latency.items()],
+        "db": [[endpoint] + values for endpoint, values in db_totals.items()],
+        "user_cache": cache,
+    }
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def collect_metric_snapshots():
+    """현재 워커의 최신 수치 + 다른 워커들이 기록한 수치 + 종료된 워커들의 누적 수치
+
+    종료된 워커 파일은 archive.json 에 합쳐서 지우므로 카운터가 줄어들지 않음 (합치기 / 읽기는 파일 잠금 안에서)
+    """
+    snapshots = [request_metrics.snapshot()]
+    directory = metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return snapshots
+
+    own = f'worker-{worker_key(os.getpid())}.json'
+    archive_path = os.path.join(directory, 'archive.json')
+    with open(os.path.join(directory, '.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read_snapshot(archive_path)
+        dead = []
+        for name in os.listdir(directory):
+            if not (name.startswith('worker-') and name.endswith('.json')) or name == own:
+                continue
+            snapshot = _read_snapshot(os.path.join(directory, name))
+            if not worker_alive(name[len('worker-'):-len('.json')]):
+                dead.append((name, snapshot))
+            elif snapshot:
+                snapshots.append(snapshot)
+
+        if dead:
+            archive = merged_snapshot([archive] * bool(archive) + [snapshot for _, snapshot in dead if snapshot])
+            with open(f'{archive_path}.tmp', 'w', encoding='utf-8') as f:
+                json.dump(archive, f, ensure_ascii=False)
+            os.replace(f'{archive_path}.tmp', archive_path)
+            for name, _ in dead:
+                os.remove(os.path.join(directory, name))
+        if archive:
+            snapshots.append(archive)
+    return snapshots
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(snapshots):
+    """Prometheus 텍스트 형식 (0.0.4)"""
+    requests, latency, db_totals, cache = merge_metric_snapshots(snapshots)
+    lines = [
+        '# HELP http_requests_total HTTP requests by endpoint, method and status.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (endpoint, method, status), count in sorted(requests.items()):
+        lines.append(f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP http_request_duration_seconds Request latency by endpoint and method.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (endpoint, method), values in sorted(latency.items()):
+        labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+        for bound, count in zip(LATENCY_BUCKETS, values):
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {values[-1]}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {values[-2]:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {values[-1]}')
+
+    lines += [
+        '# HELP db_query_duration_seconds_total Time spent executing SQL by endpoint.',
+        '# TYPE db_query_duration_seconds_total counter',
+    ]
+    for endpoint, (seconds, _) in sorted(db_totals.items()):
+        lines.append(f'db_query_duration_seconds_total{{endpoint="{_label(endpoint)}"}} {seconds:.6f}')
+    lines += [
+        '# HELP db_queries_total SQL statements executed by endpoint.',
+        '# TYPE db_queries_total counter',
+    ]
+    for endpoint, (_, queries) in sorted(db_totals.items()):
+        lines.append(f'db_queries_total{{endpoint="{_label(endpoint)}"}} {queries}')
+
+    lines += [
+        '# HELP user_cache_requests_total Username lookup cache hits and misses.',
+        '# TYPE user_cache_requests_total counter',
+        f'user_cache_requests_total{{result="hit"}} {cache["hits"]}',
+        f'user_cache_requests_total{{result="miss"}} {cache["misses"]}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view():
+    return Response(render_prometheus(collect_metric_snapshots()), mimetype='text/plain; version=0.0.4')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_time += elapsed
+
+
+def _handle_db_error(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+
+
+def add_server_timing(response):
+    """Server-Timing 헤더 (스트리밍 응답은 본문 전송 전까지의 값)"""
+    if 'request_started' in g:
+        total = (time.perf_counter() - g.request_started) * 1000
+        response.headers['Server-Timing'] = (
+            f'db;dur={g.sql_time * 1000:.2f};desc="{g.sql_count} queries", app;dur={total:.2f}'
+        )
+    return response
+
+
+def record_request_metrics(exception=None):
+    if 'request_started' not in g:
+        return
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = g.get('response_status', 500 if exception else 200)
+    request_metrics.observe(
+        endpoint, request.method, status, time.perf_counter() - g.request_started, g.sql_time, g.sql_count
+    )
+    request_metrics.maybe_flush()
+
+
+# 응답 압축 설정
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', '1') == '1'
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # 이보다 작은 응답은 압축하지 않음 (바이트)
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # 1(빠름) ~ 9(작음)
+COMPRESS_ENCODINGS = [encoding.strip() for encoding in os.getenv('COMPRESS_ENCODINGS', 'gzip,deflate').split(',')
+                      if encoding.strip() in ('gzip', 'deflate')]  # 서버 선호 순서
+
+# gzip 은 gzip 헤더, deflate 는 zlib 헤더 (HTTP 의 deflate 는 zlib 형식)
+_ZLIB_WBITS = {'gzip': 31, 'deflate': 15}
+
+
+def negotiate_encoding():
+    """Accept-Encoding 에서 품질값이 가장 높은 지원 인코딩 (같으면 서버 선호 순서)"""
+    best, best_quality = None, 0
+    for encoding in COMPRESS_ENCODINGS:
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compress_stream(chunks, encoding):
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _ZLIB_WBITS[encoding])
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """크기와 Accept-Encoding 에 따라 응답 본문을 gzip / deflate 로 압축"""
+    if (not RESPONSE_COMPRESSION or response.status_code < 200 or response.status_code == 204
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    # 304 도 재검증하는 200 응답과 같은 Vary 를 보내야 함 (본문이 없으므로 압축은 하지 않음)
+    response.vary.add('Accept-Encoding')
+    if response.status_code == 304:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # 스트리밍 응답은 전체 크기를 알 수 없으므로 항상 조각 단위로 압축
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, _ZLIB_WBITS[encoding])
+        response.set_data(compressor.compress(body) + compressor.flush())
+
+    response.headers['Content-Encoding'] = encoding
+    # 강한 ETag 는 바이트 단위로 같은 본문에만 쓸 수 있으므로 인코딩별로 구분
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+
+# 읽기 / 쓰기 분리: GET 은 복제본, 나머지와 최근에 쓴 사용자의 GET 은 primary
+READ_METHODS = ('GET', 'HEAD')
+
+
+def request_usernames():
+    """경로 / 쿼리 문자열 / JSON 본문(일괄 등록 배열 포함)에 있는 username 목록"""
+    names = {(request.view_args or {}).get('username'), request.args.get('username')}
+    body = request.get_json(silent=True) if request.is_json else None
+    for item in body if isinstance(body, list) else [body]:
+        if isinstance(item, dict):
+            names.add(item.get('username'))
+    return {name for name in names if isinstance(name, str) and name}
+
+
+def route_reads():
+    """GET 요청이면 복제본 하나를 골라 g.db_replica 에 지정 (RoutingSession 이 사용)"""
+    g.db_replica = None
+    if request.method in READ_METHODS and not write_tracker.recent(request_usernames()):
+        g.db_replica = random.choice(current_app.config['DB_REPLICA_BINDS'])
+
+
+def remember_writes(response):
+    """쓰기에 성공한 사용자는 READ_YOUR_WRITES_SECONDS 동안 primary 에서 읽도록 기록"""
+    if request.method not in READ_METHODS + ('OPTIONS',) and response.status_code < 400:
+        usernames = request_usernames()
+        if usernames:
+            write_tracker.mark(usernames)
+    return response
+
 
 # 응답 인코딩을 UTF-8로 설정
-@app.after_request
 def after_request(response):
-    response.headers['Content-Type'] = 'application/json; charset=utf-8'
-    return response
+    if response.mimetype not in ('text/plain', 'application/x-ndjson'):  # /metrics, 내보내기는 형식 유지
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+    if METRICS_ENABLED:
+        g.response_status = response.status_code
+        add_server_timing(response)
+    return compress_response(response)
+
+
+# 일정 파일 일괄 등록 (flask --app app import-schedules schedules.ndjson)
+@click.command('import-schedules')
+@with_appcontext
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--additional', is_flag=True, help='AdditionalTravelSchedule 테이블에 등록')
+@click.option('--chunk-size', default=BULK_IMPORT_CHUNK_SIZE, show_default=True, help='한 트랜잭션에서 넣을 행 수')
+def import_schedules_command(path, additional, chunk_size):
+    """JSON 배열 또는 NDJSON(.ndjson / .jsonl) 파일의 일정을 일괄 등록"""
+    with open(path, encoding='utf-8') as f:
+        items = read_bulk_items(f.read(), path.endswith(('.ndjson', '.jsonl')))
+
+    model = AdditionalTravelSchedule if additional else TravelSchedule
+    started = time.perf_counter()
+    inserted, errors = import_schedules(model, items, chunk_size)
+    for error in errors:
+        click.echo(f"#{error['index']} {error['tripId']}: {error['message']}", err=True)
+    click.echo(f"{model.__tablename__}: {inserted} inserted, {len(errors)} failed "
+               f"in {time.perf_counter() - started:.2f}s")
+
+
+# 사용자 데이터 내보내기 (flask --app app export-user alice -o alice.ndjson.gz)
+@click.command('export-user')
+@with_appcontext
+@click.argument('username')
+@click.option('-o', '--output', default='-', show_default=True, help='저장할 파일 (.gz 로 끝나면 gzip 압축)')
+@click.option('--gzip', 'compress', is_flag=True, help='gzip 압축 (표준 출력에도 적용)')
+@click.option('--include-credentials', is_flag=True, help='비밀번호 해시 포함 (백업 복원으로 사용자를 다시 만들 때)')
+def export_user_command(username, output, compress, include_credentials):
+    """사용자 프로필 / 일정 / 사진을 NDJSON 으로 내보냄"""
+    user = get_user(username)
+    if not user:
+        raise click.UsageError(f"User not found: {username}")
+
+    compress = compress or output.endswith('.gz')
+    raw = click.get_binary_stream('stdout') if output == '-' else open(output, 'wb')
+    sink = gzip.open(raw, 'wt', encoding='utf-8') if compress else io.TextIOWrapper(raw, encoding='utf-8')
+    started, count = time.perf_counter(), 0
+    with sink:
+        for line in export_user_lines(user.id, include_credentials):
+            sink.write(line)
+            count += 1
+    if output != '-':
+        raw.close()
+        click.echo(f"{username}: {count} lines written to {output} in {time.perf_counter() - started:.2f}s", err=True)
+
+
+# 내보낸 사용자 데이터 가져오기 (flask --app app import-user alice.ndjson.gz)
+@click.command('import-user')
+@with_appcontext
+@click.argument('path')
+@click.option('--username', help='파일의 사용자 대신 이 사용자에게 등록')
+@click.option('--create-user', is_flag=True, help='사용자가 없으면 파일의 프로필 / 비밀번호 해시로 생성')
+@click.option('--batch-size', default=BULK_IMPORT_CHUNK_SIZE, show_default=True, help='한 트랜잭션에서 넣을 행 수')
+def import_user_command(path, username, create_user, batch_size):
+    """export-user 로 만든 NDJSON (.gz 가능) 파일을 스트림으로 읽으며 묶음 단위로 등록"""
+    raw = click.get_binary_stream('stdin') if path == '-' else open(path, 'rb')
+    started = time.perf_counter()
+    with raw:
+        # gzip 여부는 확장자 대신 매직 바이트로 판단
+        stream = io.BufferedReader(raw) if not hasattr(raw, 'peek') else raw
+        encoding = 'gzip' if stream.peek(2)[:2] == b'\x1f\x8b' else None
+        try:
+            result = import_user_lines(open_ndjson_stream(stream, encoding), username, create_user, batch_size)
+        except (LookupError, ValueError) as e:
+            raise click.ClickException(str(e))
+    for error in result.pop('errors'):
+        click.echo(f"line {error['line']}: {error['message']}", err=True)
+    summary = ', '.join(f"{kind} {count}" for kind, count in result.items())
+    click.echo(f"imported {summary} in {time.perf_counter() - started:.2f}s")
+
+
+# 스키마 마이그레이션 (flask --app app migrate)
+# 순서대로 한 번씩만 적용되며 적용 이력은 schema_migrations 테이블에 기록
+def migration_create_tables(conn):
+    db.metadata.create_all(conn)
+
+
+def create_indexes(conn, *names):
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(conn, checkfirst=True)
+
+
+def migration_create_lookup_indexes(conn):
+    create_indexes(
+        conn,
+        'ix_travel_schedule_user_id_timestamp',
+        'ix_additional_travel_schedule_user_id_timestamp',
+        'ix_photo_user_id_timestamp',
+    )
+
+
+def add_column_if_missing(conn, column):
+    table = column.table
+    existing = {info['name'] for info in db.inspect(conn).get_columns(table.name)}
+    if column.name not in existing:
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} ADD {ddl}")
+
+
+def migration_add_version_columns(conn):
+    add_column_if_missing(conn, User.__table__.c.data_version)
+    add_column_if_missing(conn, User.__table__.c.data_updated_at)
+    add_column_if_missing(conn, TravelSchedule.__table__.c.version)
+    add_column_if_missing(conn, AdditionalTravelSchedule.__table__.c.version)
+
+
+def migration_create_feedback_stats(conn):
+    FeedbackStats.__table__.create(conn, checkfirst=True)
+    rebuild_feedback_stats(conn)
+
+
+def migration_create_search_index(conn):
+    ScheduleSearchTerm.__table__.create(conn, checkfirst=True)
+    create_indexes(conn, 'ix_schedule_search_term_lookup')
+    for model in SEARCH_SOURCES:
+        rebuild_search_index(conn, model)
+
+
+def migration_create_schedule_date_indexes(conn):
+    create_indexes(
+        conn,
+        'ix_travel_schedule_user_id_start_date_end_date',
+        'ix_additional_travel_schedule_user_id_start_date_end_date',
+    )
+
+
+def migration_add_photo_location_key(conn):
+    table = Photo.__table__
+    add_column_if_missing(conn, table.c.location_key)
+    # 위치 종류는 많지 않으므로 위치 값별 UPDATE 로 채움
+    locations = conn.execute(
+        db.select(table.c.location).distinct()
+        .where(table.c.location.isnot(None), table.c.location_key.is_(None))
+    ).scalars().all()
+    for location in locations:
+        conn.execute(table.update().where(table.c.location == location)
+                     .values(location_key=normalize_location(location)))
+    create_indexes(conn, 'ix_photo_user_id_location_key_timestamp')
+
+
+def migration_unwrap_double_encoded_json(conn, batch_size=500):
+    """json.dumps 문자열로 저장된 일정 JSON 컬럼을 한 번만 인코딩된 값으로 다시 저장 (검색 색인도 다시 만듦)
+
+    큰 테이블을 한 트랜잭션에 잡아두지 않도록 batch_size 행마다 커밋
+    """
+    columns = ('transportation', 'keywords', 'days', 'extra_info')
+    for model in (TravelSchedule, AdditionalTravelSchedule):
+        table = model.__table__
+        raw_columns = [db.type_coerce(table.c[name], db.UnicodeText).label(name) for name in columns]
+        update = table.update().where(table.c.id == db.bindparam('row_id')).values(
+            {name: db.bindparam(f'new_{name}', type_=db.UnicodeText) for name in columns}
+        )
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                db.select(table.c.id, *raw_columns).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            params = []
+            for row in rows:
+                unwrapped = {name: unwrap_double_encoded_json(getattr(row, name)) for name in columns}
+                if any(value is not None for value in unwrapped.values()):
+                    params.append(dict(
+                        {f'new_{name}': getattr(row, name) if value is None else value
+                         for name, value in unwrapped.items()},
+                        row_id=row.id
+                    ))
+            if params:
+                conn.execute(update, params)
+                ids = [param['row_id'] for param in params]
+                unindex_schedules(conn, model, ids)
+                index_schedules(conn, model, conn.execute(
+                    db.select(table.c.id, table.c.user_id, table.c.title, table.c.keywords, table.c.summary)
+                    .where(table.c.id.in_(ids))
+                ).all())
+            conn.commit()
+
+
+def migration_drop_user_id_indexes(conn):
+    # (user_id, timestamp) 복합 인덱스의 앞 컬럼과 같은 단일 컬럼 인덱스 (예전 마이그레이션 2 에서 생성)
+    for table in (TravelSchedule.__table__, AdditionalTravelSchedule.__table__, Photo.__table__):
+        name = f'ix_{table.name}_user_id'
+        if name in {index['name'] for index in db.inspect(conn).get_indexes(table.name)}:
+            db.Index(name, table.c.user_id).drop(conn)
+
+
+MIGRATIONS = [
+    (1, 'create tables', migration_create_tables),
+    (2, '(user_id, timestamp) lookup indexes', migration_create_lookup_indexes),
+    (3, 'user data_version and schedule row version for ETags', migration_add_version_columns),
+    (4, 'feedback_stats aggregate row', migration_create_feedback_stats),
+    (5, 'photo location_key and (user_id, location_key, timestamp) index', migration_add_photo_location_key),
+    (6, 'schedule search index', migration_create_search_index),
+    (7, '(user_id, start_date, end_date) schedule date range indexes', migration_create_schedule_date_indexes),
+    (8, 'unwrap double-encoded schedule JSON columns', migration_unwrap_double_encoded_json),
+    (9, 'drop user_id indexes covered by (user_id, timestamp)', migration_drop_user_id_indexes),
+]
+
+schema_migrations = db.Table(
+    'schema_migrations', db.MetaData(),
+    db.Column('version', db.Integer, primary_key=True, autoincrement=False),
+    db.Column('description', db.String(255), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False),
+)
+
+
+def run_migrations():
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용하고 적용한 버전 목록 반환"""
+    applied = []
+    with db.engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        done = set(conn.execute(db.select(schema_migrations.c.version)).scalars())
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        # 마이그레이션 안에서 conn.commit() 으로 나눠 커밋할 수 있음 (버전 기록은 마지막 커밋에 포함)
+        with db.engine.connect() as conn:
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+            conn.commit()
+        applied.append(version)
+    return applied
+
+
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """스키마 마이그레이션 적용"""
+    applied = run_migrations()
+    for version, description, _ in MIGRATIONS:
+        state = 'applied' if version in applied else 'up to date'
+        click.echo(f"{version:>3} {description}: {state}")
+
+
+# 피드백 집계 재계산 (flask --app app rebuild-feedback-stats)
+@click.command('rebuild-feedback-stats')
+@with_appcontext
+def rebuild_feedback_stats_command():
+    """Feedback 원본 테이블에서 /feedback/stats 집계를 다시 계산"""
+    values = rebuild_feedback_stats(db.session)
+    db.session.commit()
+    histogram = ' '.join(f"{rating}:{values[f'rating_{rating}']}" for rating in FEEDBACK_RATINGS)
+    click.echo(f"feedback_stats: count={values['count']} rating_sum={values['rating_sum']} "
+               f"deduction_sum={values['deduction_sum']} histogram {histogram}")
+
+
+# 일정 검색 색인 재생성 (flask --app app rebuild-search-index)
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """일정 테이블 전체로 /schedule/search 색인을 다시 만듦"""
+    for model in SEARCH_SOURCES:
+        started = time.perf_counter()
+        indexed = rebuild_search_index(db.session, model)
+        db.session.commit()
+        click.echo(f"{model.__tablename__}: {indexed} schedules indexed in {time.perf_counter() - started:.2f}s")
+
+
+# 엔드포인트별 쿼리가 인덱스를 사용하는지 확인 (SQLite 대체 DB 에서 실행)
+def endpoint_queries():
+    """(설명, SELECT 문[, 정렬 허용]) 목록 - 각 API 가 실제로 보내는 쿼리 형태
+
+    세 번째 값이 True 이면 일치한 행만 모아서 정렬하는 TEMP B-TREE 를 허용 (검색 점수 정렬, 기간 조회 등)
+    """
+    queries = [
+        ('UserProfile / get_user: username', db.select(User).filter_by(username='plan-check')),
+    ]
+    for model in (TravelSchedule, AdditionalTravelSchedule, Photo):
+        name = model.__tablename__
+        queries += [
+            # (user_id, timestamp) 인덱스로 사용자 행만 읽고 id 순 정렬은 그 행들에서만
+            (f'{name} list: order=id', db.select(model).filter_by(user_id=1).order_by(model.id), True),
+            (f'{name} list: order=timestamp', db.select(model).filter_by(user_id=1)
+             .order_by(model.timestamp, model.id)),
+            (f'{name} list: after cursor', db.select(model).filter_by(user_id=1)
+             .filter(or_(model.timestamp > datetime(2024, 1, 1),
+                         and_(model.timestamp == datetime(2024, 1, 1), model.id > 10)))
+             .order_by(model.timestamp, model.id)),
+        ]
+    queries += [
+        ('photo list: from/to, order=-timestamp', db.select(Photo).filter_by(user_id=1)
+         .filter(Photo.timestamp >= datetime(2024, 1, 1), Photo.timestamp < datetime(2024, 7, 1))
+         .order_by(Photo.timestamp.desc(), Photo.id.desc())),
+        ('photo list: location, order=timestamp', db.select(Photo).filter_by(user_id=1, location_key='제주')
+         .order_by(Photo.timestamp, Photo.id)),
+        ('photo list: location + from/to', db.select(Photo).filter_by(user_id=1, location_key='제주')
+         .filter(Photo.timestamp >= datetime(2024, 1, 1), Photo.timestamp < datetime(2024, 7, 1))
+         .order_by(Photo.timestamp, Photo.id)),
+    ]
+    term = ScheduleSearchTerm
+    queries.append(('schedule search: terms', db.select(term.schedule_id, db.func.sum(term.weight))
+                    .where(term.user_id == 1, term.source == 1, term.term.in_(['제주', '주도']))
+                    .group_by(term.schedule_id).having(db.func.count() == 2), True))
+    for model in (TravelSchedule, AdditionalTravelSchedule):
+        name = model.__tablename__
+        queries += [
+            (f'{name} detail: trip_id', db.select(model).filter_by(trip_id='plan-check')),
+            (f'{name} batch: trip_ids', db.select(model).filter(model.trip_id.in_(['plan-check', 'plan-check-2']))),
+            (f'{name} list: from/to', db.select(model).filter_by(user_id=1)
+             .filter(model.start_date <= date(2024, 5, 31), model.end_date >= date(2024, 5, 1))
+             .order_by(model.id), True),
+        ]
+    return queries
+
+
+def check_query_plans():
+    """EXPLAIN QUERY PLAN 결과 중 인덱스를 쓰지 않는 쿼리의 (설명, 실행 계획) 목록 반환"""
+    failures = []
+    with db.engine.connect() as conn:
+        for description, statement, *temp_sort_ok in endpoint_queries():
+            sql = str(statement.compile(conn, compile_kwargs={'literal_binds': True}))
+            plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+            uses_index = any('USING' in step and 'INDEX' in step or 'PRIMARY KEY' in step for step in plan)
+            full_scan = any(step.startswith('SCAN') and 'INDEX' not in step for step in plan)
+            temp_sort = any('TEMP B-TREE' in step for step in plan) and not any(temp_sort_ok)
+            if not uses_index or full_scan or temp_sort:
+                failures.append((description, plan))
+    return failures
+
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """각 API 쿼리가 인덱스를 사용하는지 확인 (실패 시 종료 코드 1)"""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.UsageError('check-query-plans runs against the SQLite stand-in (DATABASE_URL=sqlite:///...)')
+    failures = check_query_plans()
+    for description, plan in failures:
+        click.echo(f"FAIL {description}: {' / '.join(plan)}", err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"OK: {len(endpoint_queries())} queries use an index")
+
+
+# 앱 팩토리
+CLI_COMMANDS = [import_schedules_command, export_user_command, import_user_command, migrate_command,
+                rebuild_feedback_stats_command, rebuild_search_index_command, check_query_plans_command]
+
+
+# create_app 으로 만든 엔진들 (앱을 붙잡지 않도록 약한 참조)
+_app_engines = weakref.WeakSet()
+
+
+def _dispose_engines_after_fork():
+    """gunicorn --preload 로 fork 된 워커가 부모 프로세스의 커넥션을 공유하지 않도록 풀 초기화"""
+    for engine in list(_app_engines):
+        engine.dispose(close=False)
+
+
+# fork / 종료 훅은 앱 수와 관계없이 모듈에서 한 번만 등록
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+atexit.register(request_metrics.maybe_flush, force=True)
+
+
+def _setup_engines(app):
+    """앱 엔진에 접속 설정 / 계측 리스너를 붙이고 fork 시 초기화 대상에 추가"""
+    listeners = [('connect', on_connect)]
+    if METRICS_ENABLED:
+        listeners += [
+            ('before_cursor_execute', _before_cursor_execute),
+            ('after_cursor_execute', _after_cursor_execute),
+            ('handle_error', _handle_db_error),
+        ]
+    with app.app_context():
+        for engine in db.engines.values():
+            for name, listener in listeners:
+                if not event.contains(engine, name, listener):
+                    event.listen(engine, name, listener)
+            _app_engines.add(engine)
+
+
+def create_app(config=None):
+    """Flask 앱 생성
+
+    DB 에는 첫 요청에서 커넥션을 꺼낼 때 연결하므로 import / 워커 부팅이 DB 상태에 영향을 받지 않음
+    스키마 생성 / 변경은 flask --app app migrate 로 명시적으로 실행
+    (gunicorn 으로 실행하면 gunicorn.conf.py 가 워커를 띄우기 전에 실행 - 적용 전에는 User 조회가 모두 실패함)
+    """
+    app = Flask(__name__)
+
+    # CORS 설정을 더 구체적으로 지정
+    CORS(app, resources={
+        r"/*": {
+            "origins": ["*"],  # 모든 출처 허용 (개발 환경용)
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization", "If-Match", "If-None-Match"],
+            "expose_headers": ["ETag", "X-Next-Cursor"]
+        }
+    })
+
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config or {})
+    if 'SQLALCHEMY_DATABASE_URI' not in app.config:
+        app.config['SQLALCHEMY_DATABASE_URI'] = default_database_uri()
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    if DATABASE_REPLICA_URLS and 'SQLALCHEMY_BINDS' not in app.config:
+        app.config['SQLALCHEMY_BINDS'] = {
+            f'replica_{index}': dict(build_engine_options(url), url=url) for index, url in enumerate(DATABASE_REPLICA_URLS)
+        }
+    # 'replica' 로 시작하는 bind 를 읽기 전용 복제본으로 사용
+    app.config.setdefault('DB_REPLICA_BINDS', sorted(
+        key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica')
+    ))
+
+    db.init_app(app)
+    _setup_engines(app)
+    if WRITE_BEHIND:
+        write_behind.init_app(app)
+
+    # RESTful API 리소스 추가
+    api = Api(app)
+    api.representation('application/json')(output_json)
+    api.add_resource(UserRegistration, '/register')
+    api.add_resource(UserLogin, '/login')
+    api.add_resource(UserProfile, '/user/<string:username>')
+    api.add_resource(UserExportResource, '/user/<string:username>/export')
+    api.add_resource(UserImportResource, '/user/<string:username>/import')
+    api.add_resource(TravelScheduleResource, '/schedule')  # 전체 일정 조회 및 추가
+    api.add_resource(TravelScheduleDetailResource, '/schedule/<string:trip_id>')
+    # 아래 컬렉션 경로 이름은 RESERVED_TRIP_IDS 에도 추가해야 함
+    api.add_resource(ScheduleBulkImportResource, '/schedule/bulk', endpoint='schedule_bulk',
+                     resource_class_kwargs={'model': TravelSchedule})
+    api.add_resource(ScheduleSearchResource, '/schedule/search', endpoint='schedule_search',
+                     resource_class_kwargs={'model': TravelSchedule})
+    api.add_resource(ScheduleBatchResource, '/schedule/batch', endpoint='schedule_batch',
+                     resource_class_kwargs={'model': TravelSchedule})
+    api.add_resource(AdditionalTravelScheduleResource, '/additional_schedule')
+    api.add_resource(AdditionalTravelScheduleDetailResource, '/additional_schedule/<string:trip_id>')
+    api.add_resource(ScheduleBulkImportResource, '/additional_schedule/bulk', endpoint='additional_schedule_bulk',
+                     resource_class_kwargs={'model': AdditionalTravelSchedule})
+    api.add_resource(ScheduleSearchResource, '/additional_schedule/search', endpoint='additional_schedule_search',
+                     resource_class_kwargs={'model': AdditionalTravelSchedule})
+    api.add_resource(ScheduleBatchResource, '/additional_schedule/batch', endpoint='additional_schedule_batch',
+                     resource_class_kwargs={'model': AdditionalTravelSchedule})
+    api.add_resource(FeedbackResource, '/feedback')
+    api.add_resource(FeedbackStatsResource, '/feedback/stats')
+    api.add_resource(PhotoResource, '/photos')
+    api.add_resource(PhotoBatchResource, '/photos/batch')
+
+    app.after_request(after_request)
+    if app.config['DB_REPLICA_BINDS']:
+        app.before_request(route_reads)
+        app.after_request(remember_writes)
+    if METRICS_ENABLED:
+        app.before_request(start_request_timer)
+        app.teardown_request(record_request_metrics)
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
+    for command in CLI_COMMANDS:
+        app.cli.add_command(command)
+    return app
+
+
+# gunicorn app:app / wsgi.py 용 기본 앱
+app = create_app()
 
 
 # 서버 실행
@@ -0,0 +1,61 @@
+"""일정 응답 압축 효과 측정: 전송 바이트 수와 응답당 압축 CPU 시간
+
+사용법:
+    python benchmarks/compression.py --schedules 20 --repeat 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serialization import sample_schedule  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schedules', type=int, default=20, help='목록 응답에 들어갈 일정 수')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'compress.db'))
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+    os.environ['RESPONSE_COMPRESSION'] = '0'  # 원본 본문을 받아서 아래에서 직접 압축
+
+    import app as app_module
+    from app import app, TravelSchedule
+
+    with app.app_context():
+        app_module.run_migrations()
+    client = app.test_client()
+    client.post('/register', json={
+        "username": "bench", "password": "pw", "nickname": "bench", "birthyear": 1990, "gender": "M"
+    })
+    with app.app_context():
+        app_module.import_schedules(TravelSchedule, [sample_schedule(i) for i in range(args.schedules)])
+
+    bodies = {
+        f'/schedule ({args.schedules} trips)': client.get('/schedule?username=bench').data,
+        '/schedule?view=summary': client.get('/schedule?username=bench&view=summary').data,
+        '/schedule/<trip_id>': client.get('/schedule/bench-0?username=bench').data,
+    }
+
+    print(f"{'response':<28}{'encoding':<10}{'level':>6}{'bytes':>10}{'ratio':>8}{'cpu/resp':>12}")
+    for label, body in bodies.items():
+        print(f"{label:<28}{'identity':<10}{'-':>6}{len(body):>10}{'1.00':>8}{'-':>12}")
+        for encoding, wbits in (('gzip', 31), ('deflate', 15)):
+            for level in (1, 6, 9):
+                started = time.process_time()
+                for _ in range(args.repeat):
+                    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+                    compressed = compressor.compress(body) + compressor.flush()
+                cpu = (time.process_time() - started) / args.repeat
+                print(f"{'':<28}{encoding:<10}{level:>6}{len(compressed):>10}"
+                      f"{len(compressed) / len(body):>8.2f}{cpu * 1000:>9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
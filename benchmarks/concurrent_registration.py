@@ -0,0 +1,76 @@
+"""동시 회원가입 시 중복 사용자가 생기지 않는지 확인하고 처리량 측정
+
+같은 username / nickname 으로 여러 스레드가 동시에 /register 를 호출해서
+unique 제약만으로 중복이 막히는지 검사함 (중복이 생기면 종료 코드 1)
+
+사용법:
+    python benchmarks/concurrent_registration.py --threads 16 --users 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--users', type=int, default=50, help='서로 다른 사용자 수 (스레드마다 전부 가입 시도)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'register.db'))
+    # 해시 비용은 측정 대상이 아니므로 최소화
+    os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from app import app, db, User, run_migrations
+
+    with app.app_context():
+        run_migrations()
+    client = app.test_client()
+    results = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker(index):
+        barrier.wait()
+        for user in range(args.users):
+            # 절반은 username 충돌, 나머지 절반은 nickname 충돌을 일으킴
+            name = f'user{user}' if index % 2 == 0 else f'user{user}-{index}'
+            response = client.post('/register', json={
+                "username": name, "password": "pw", "nickname": f'nick{user}',
+                "birthyear": 1990, "gender": "F"
+            })
+            with lock:
+                results[(response.status_code, response.get_json()['message'])] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    for (status, message), count in sorted(results.items()):
+        print(f'{status} {message}: {count}')
+    print(f'{sum(results.values()) / elapsed:.0f} registrations/s')
+
+    with app.app_context():
+        total = User.query.count()
+        nicknames = db.session.query(User.nickname).distinct().count()
+    created = sum(count for (status, _), count in results.items() if status == 201)
+    print(f'users in table: {total}, distinct nicknames: {nicknames}, 201 responses: {created}')
+    if not (total == nicknames == created == args.users):
+        print('FAIL: duplicate or missing users')
+        sys.exit(1)
+    print('OK: no duplicates')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""사용자 데이터 NDJSON 내보내기 / 가져오기: 처리량과 메모리 사용량
+
+일정 수가 다른 두 사용자를 내보내면서 초당 줄 수와 tracemalloc 최대 메모리를 비교해서
+데이터 양이 늘어도 메모리는 일정한지 확인하고 (작은 쪽도 STREAM_BATCH_SIZE 보다 여러 배 커야 비교 의미 있음), 큰 쪽 파일(gzip)을 새 DB 에 --create-user 로
+가져온 뒤 다시 내보낸 결과가 원본과 같은지 확인함 (다르면 종료 코드 1)
+
+사용법:
+    python benchmarks/export_import.py --small 4000 --large 20000
+"""
+import argparse
+import gzip
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serialization import sample_schedule  # noqa: E402
+
+
+def seed(count, username):
+    import app as app_module
+    from app import db, User, TravelSchedule, AdditionalTravelSchedule
+
+    db.session.add(User(username=username, nickname=username, password_hash='-', birthyear=1990, gender='F'))
+    db.session.commit()
+    user_id = db.session.query(User.id).filter_by(username=username).scalar()
+    for model, prefix in ((TravelSchedule, 'trip'), (AdditionalTravelSchedule, 'extra')):
+        items = [dict(sample_schedule(index), username=username, tripId=f"{prefix}-{username}-{index}")
+                 for index in range(count // 2)]
+        app_module.import_schedules(model, items)
+    app_module.import_photos(user_id, [{
+        "photoUri": f"https://example.com/{username}/{index}.jpg", "location": "제주",
+        "timestamp": f"2024-05-01T10:{index // 60 % 60:02d}:{index % 60:02d}.{index:06d}Z"
+    } for index in range(count)])
+    return user_id
+
+
+def export_lines(app_module, user_id):
+    return [line for line in app_module.export_user_lines(user_id, include_credentials=True)
+            if '"type":"export"' not in line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--small', type=int, default=4000, help='작은 사용자의 일정 수 (사진도 같은 수)')
+    parser.add_argument('--large', type=int, default=20000, help='큰 사용자의 일정 수 (사진도 같은 수)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'source.db')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import app as app_module
+    from app import app
+
+    ok = True
+    with app.app_context():
+        app_module.run_migrations()
+        users = {name: seed(count, name) for name, count in (('small', args.small), ('large', args.large))}
+
+        print(f"{'user':<8}{'lines':>8}{'seconds':>9}{'lines/s':>10}{'peak KB':>9}")
+        peaks = {}
+        for name, user_id in users.items():
+            for _ in app_module.export_user_lines(user_id):  # 쿼리 컴파일 캐시 등은 측정에서 제외
+                pass
+            app_module.db.session.remove()
+            tracemalloc.start()
+            started, lines = time.perf_counter(), 0
+            for _ in app_module.export_user_lines(user_id):
+                lines += 1
+            elapsed = time.perf_counter() - started
+            peaks[name] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+            print(f"{name:<8}{lines:>8}{elapsed:>9.2f}{lines / elapsed:>10.0f}{peaks[name]:>9.0f}")
+            app_module.db.session.remove()
+        growth = peaks['large'] / peaks['small']
+        print(f"peak memory large / small: {growth:.2f}x for {args.large / args.small:.0f}x data")
+        ok = growth < 1.5
+
+        expected = export_lines(app_module, users['large'])
+
+    # CLI 로 내보내고 새 DB 에 가져오기 (별도 프로세스라 DATABASE_URL 만 바꿔서 실행)
+    path = os.path.join(directory, 'large.ndjson.gz')
+    env = dict(os.environ)
+    run = [sys.executable, '-m', 'flask', '--app', 'app']
+    subprocess.run(run + ['export-user', 'large', '-o', path, '--include-credentials'], cwd=ROOT, env=env, check=True)
+    with gzip.open(path, 'rb') as f:
+        print(f"export file {os.path.getsize(path) / 1024:.0f} KB gzip, {len(f.read()) / 1024:.0f} KB raw")
+
+    env['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'target.db')
+    subprocess.run(run + ['migrate'], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    subprocess.run(run + ['import-user', path, '--create-user'], cwd=ROOT, env=env, check=True)
+
+    result = subprocess.run(run + ['export-user', 'large', '--include-credentials'], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True)
+    restored = [line + '\n' for line in result.stdout.splitlines() if '"type":"export"' not in line]
+    same = restored == expected
+    print(f"round trip: {len(restored)} lines, identical to source: {same}")
+
+    app_module.password_hasher.shutdown()
+    if not (ok and same):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+"""REST API 부하 테스트 / 벤치마크
+
+SQLite 대체 DB 에 실제와 비슷한 양의 데이터(사용자, 여러 날짜 일정, 사진, 피드백)를 넣고
+실제 앱을 로컬 HTTP 서버로 띄운 뒤 동시 클라이언트로 모든 API 를 호출해서
+p50/p95/p99 지연시간, 초당 요청 수, 요청당 SQL 쿼리 수를 출력함
+
+사용법:
+    python benchmarks/load_test.py                               # 측정 결과 출력
+    python benchmarks/load_test.py --save-baseline               # benchmarks/baseline.json 갱신
+    python benchmarks/load_test.py --compare --tolerance 0.5     # 기준값 대비 성능 저하 시 종료 코드 1
+
+전체 시나리오를 --rounds 번 반복해서 시나리오별 중앙값을 사용함 (잠깐 느려진 구간의 영향을 줄임)
+기준값에는 측정 환경(파이썬 / CPU / DB / 데이터 양 등)도 함께 저장함. 데이터 양 / 요청 수 옵션이 같아야 비교할 수 있고,
+머신과 무관한 요청당 쿼리 수는 항상, p50 / 처리량은 나머지 환경까지 같을 때만 비교함. 이때 이번 실행 전체가 기준값보다 빠르거나 느린 정도(시나리오별 p50 비율의
+중앙값)로 먼저 나눠서 머신 부하에 따른 전체적인 차이는 빼고 특정 시나리오만 느려진 경우를 찾음
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serialization import sample_schedule  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MIN_TIMED_REQUESTS = 100  # 요청 수(전체 반복 합계)가 이보다 적은 시나리오는 p50 / 처리량 비교에서 제외 (편차가 큼)
+QUERY_TOLERANCE = (0.05, 0.1)  # 요청당 쿼리 수 허용치 (비율, 절대값) - If-Match: * 재시도 등으로 조금씩 달라짐
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def cpu_model():
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def environment(app_module, args):
+    """기준값이 유효한 측정 환경 (load 가 다르면 비교 불가, 나머지가 다르면 시간 비교를 건너뜀)"""
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "system": f"{platform.system()} {platform.machine()}",
+        "cpu": cpu_model(),
+        "cpus": os.cpu_count(),
+        "database": app_module.db.engine.dialect.name,
+        "sqlite": sqlite3.sqlite_version,
+        "orjson": app_module.orjson is not None,
+        "load": {name: getattr(args, name) for name in
+                 ('users', 'schedules_per_user', 'photos_per_user', 'feedback', 'requests', 'concurrency', 'rounds')},
+    }
+
+
+def seed(app_module, users, schedules_per_user, photos_per_user, feedback):
+    """벤치마크용 데이터 생성 (HTTP 를 거치지 않고 DB 에 직접 일괄 등록)"""
+    from app import db, User, Photo, Feedback, TravelSchedule, AdditionalTravelSchedule
+
+    password_hash = app_module.password_hasher.hash('bench-password')
+    db.session.execute(db.insert(User), [{
+        "username": f"user{i}", "nickname": f"nick{i}", "password_hash": password_hash,
+        "birthyear": 1980 + i % 30, "gender": "F" if i % 2 else "M", "marketing_consent": bool(i % 3),
+        "preferences": json.dumps(["자연", "맛집"]), "music_genres": json.dumps(["발라드"])
+    } for i in range(users)])
+    db.session.commit()
+
+    for model, prefix in ((TravelSchedule, 'trip'), (AdditionalTravelSchedule, 'extra')):
+        items = []
+        for user in range(users):
+            for index in range(schedules_per_user):
+                item = sample_schedule(index)
+                item.update(username=f"user{user}", tripId=f"{prefix}-{user}-{index}")
+                items.append(item)
+        app_module.import_schedules(model, items)
+
+    db.session.execute(db.insert(Photo), [{
+        "user_id": user + 1, "photo_uri": f"https://example.com/photos/{user}/{index}.jpg",
+        "location": ["제주", "부산", "서울", "강릉"][index % 4],
+        "timestamp": app_module.datetime(2024, 1 + index % 12, 1 + index % 28, index % 24)
+    } for user in range(users) for index in range(photos_per_user)])
+    db.session.execute(db.insert(Feedback), [{
+        "rating": 1 + index % 5, "deduction": index % 3, "comment": "일정이 마음에 들어요"
+    } for index in range(feedback)])
+    app_module.rebuild_feedback_stats(db.session)
+    db.session.commit()
+
+
+def build_scenarios(users):
+    """(이름, 요청 수 비율, 요청 생성 함수) 목록 - 요청 생성 함수는 (method, path, body[, headers]) 반환
+
+    body 가 bytes 면 그대로 보냄 (NDJSON 가져오기)
+    """
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def next_id():
+        with lock:
+            return next(counter)
+
+    def user():
+        return f"user{next_id() % users}"
+
+    def new_schedule(prefix):
+        index = next_id()
+        item = sample_schedule(index)
+        item.update(username=f"user{index % users}", tripId=f"{prefix}-new-{index}")
+        return item
+
+    created = {'trip': [], 'extra': []}
+
+    def create(prefix, path):
+        def request():
+            item = new_schedule(prefix)
+            with lock:
+                created[prefix].append(item)
+            return 'POST', path, item
+        return request
+
+    def delete(prefix, path):
+        def request():
+            with lock:
+                item = created[prefix].pop() if created[prefix] else None
+            if item is None:
+                return 'GET', f"{path}/{prefix}-0-0?username=user0", None
+            return 'DELETE', f"{path}/{item['tripId']}?username={item['username']}", None
+        return request
+
+    def detail(prefix, path):
+        def request():
+            index = next_id()
+            return 'GET', f"{path}/{prefix}-{index % users}-{index % 5}?username=user{index % users}", None
+        return request
+
+    def batch(prefix, path):
+        # 홈 화면처럼 사용자의 일정 여러 개를 한 번에 조회
+        def request():
+            index = next_id() % users
+            ids = ','.join(f"{prefix}-{index}-{n}" for n in range(5))
+            return 'GET', f"{path}/batch?username=user{index}&ids={ids}&view=summary", None
+        return request
+
+    def patch(prefix, path):
+        # days 의 메모 하나만 수정 (If-Match: * 로 버전 충돌 없이 부분 수정 비용만 측정)
+        def request():
+            index = next_id()
+            return 'PATCH', f"{path}/{prefix}-{index % users}-{index % 5}?username=user{index % users}", [
+                {"op": "replace", "path": f"/days/{index % 4}/places/0/memo", "value": f"메모 {index}"}
+            ], {'If-Match': '*'}
+        return request
+
+    def import_lines():
+        # 사진 20장짜리 NDJSON (내보내기 형식 그대로, 요청마다 시각이 달라 중복 제거에 걸리지 않음)
+        index = next_id()
+        lines = [{"type": "photo", "data": {
+            "photoUri": f"https://example.com/import/{index}/{n}.jpg", "location": "제주",
+            "timestamp": f"2024-07-{1 + n:02d}T09:00:00.{index % 1000000:06d}Z"
+        }} for n in range(20)]
+        return 'POST', f"/user/{user()}/import", ''.join(json.dumps(line) + '\n' for line in lines).encode(), {
+            'Content-Type': 'application/x-ndjson'
+        }
+
+    def register():
+        index = next_id()
+        return 'POST', '/register', {
+            "username": f"new{index}-{time.time_ns()}", "password": "pw", "nickname": f"newnick{index}-{time.time_ns()}",
+            "birthyear": 1995, "gender": "F", "preferences": ["바다"], "music_genres": ["팝"]
+        }
+
+    return [
+        ('POST /register', 0.1, register),
+        ('POST /login', 0.1, lambda: ('POST', '/login', {"username": user(), "password": "bench-password"})),
+        ('GET /user/<username>', 1, lambda: ('GET', f"/user/{user()}", None)),
+        ('PUT /user/<username>', 0.5, lambda: ('PUT', f"/user/{user()}", {"marketing_consent": next_id() % 2})),
+        ('GET /user/<username>/export', 0.1, lambda: ('GET', f"/user/{user()}/export", None)),
+        ('POST /user/<username>/import', 0.1, import_lines),
+        ('GET /schedule', 1, lambda: ('GET', f"/schedule?username={user()}", None)),
+        ('GET /schedule?view=summary', 1, lambda: ('GET', f"/schedule?username={user()}&view=summary", None)),
+        ('GET /schedule?limit=5', 1, lambda: ('GET', f"/schedule?username={user()}&limit=5", None)),
+        ('GET /schedule?from&to', 1, lambda: (
+            'GET', f"/schedule?username={user()}&from=2024-05-01&to=2024-05-31&view=summary", None)),
+        ('GET /schedule/batch', 1, batch('trip', '/schedule')),
+        ('POST /schedule', 0.5, create('trip', '/schedule')),
+        ('GET /schedule/<trip_id>', 1, detail('trip', '/schedule')),
+        ('PATCH /schedule/<trip_id>', 0.5, patch('trip', '/schedule')),
+        ('GET /schedule/search', 1, lambda: (
+            'GET', f"/schedule/search?username={user()}&q={quote('해운대 여행')}&view=summary&limit=20", None)),
+        ('DELETE /schedule/<trip_id>', 0.5, delete('trip', '/schedule')),
+        ('POST /schedule/bulk', 0.1, lambda: ('POST', '/schedule/bulk', [new_schedule('trip') for _ in range(20)])),
+        ('GET /additional_schedule', 1, lambda: ('GET', f"/additional_schedule?username={user()}", None)),
+        ('GET /additional_schedule?from&to', 0.5, lambda: (
+            'GET', f"/additional_schedule?username={user()}&from=2024-05-01&to=2024-05-31&view=summary", None)),
+        ('GET /additional_schedule/batch', 0.5, batch('extra', '/additional_schedule')),
+        ('POST /additional_schedule', 0.5, create('extra', '/additional_schedule')),
+        ('GET /additional_schedule/<trip_id>', 1, detail('extra', '/additional_schedule')),
+        ('PATCH /additional_schedule/<trip_id>', 0.5, patch('extra', '/additional_schedule')),
+        ('GET /additional_schedule/search', 0.5, lambda: (
+            'GET', f"/additional_schedule/search?username={user()}&q={quote('해운대')}&limit=20", None)),
+        ('DELETE /additional_schedule/<trip_id>', 0.5, delete('extra', '/additional_schedule')),
+        ('POST /additional_schedule/bulk', 0.1,
+         lambda: ('POST', '/additional_schedule/bulk', [new_schedule('extra') for _ in range(20)])),
+        ('GET /feedback?limit=50', 1, lambda: ('GET', '/feedback?limit=50', None)),
+        ('GET /feedback', 0.1, lambda: ('GET', '/feedback', None)),
+        ('GET /feedback/stats', 1, lambda: ('GET', '/feedback/stats', None)),
+        ('POST /feedback', 0.5, lambda: ('POST', '/feedback', {"rating": 1 + next_id() % 5, "deduction": 0, "comment": "좋아요"})),
+        ('GET /photos', 1, lambda: ('GET', f"/photos?username={user()}", None)),
+        ('GET /photos?from&to&order=-timestamp', 1, lambda: (
+            'GET', f"/photos?username={user()}&from=2024-03-01&to=2024-09-01&order=-timestamp&limit=20", None)),
+        ('GET /photos?location', 1, lambda: ('GET', f"/photos?username={user()}&location={quote('제주')}&limit=20", None)),
+        ('POST /photos', 0.5, lambda: ('POST', '/photos', {
+            "username": user(), "photoUri": "https://example.com/p.jpg", "location": "제주",
+            "timestamp": "2024-05-01T10:00:00.000Z"
+        })),
+        ('POST /photos/batch', 0.1, lambda: ('POST', '/photos/batch', {"username": user(), "photos": [{
+            "photoUri": f"https://example.com/batch/{index}.jpg", "location": ["제주", "부산"][index % 2],
+            "timestamp": f"2024-06-{1 + index:02d}T09:00:00.000Z"
+        } for index in range(20)]})),
+        ('GET /metrics', 0.1, lambda: ('GET', '/metrics', None)),
+    ]
+
+
+def run_scenario(base_url, make_request, total, concurrency, query_counter):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            method, path, body, *headers = make_request()
+            data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+            req = urllib.request.Request(base_url + path, data=data, method=method,
+                                         headers=dict({'Content-Type': 'application/json'}, **(headers[0] if headers else {})))
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req) as response:
+                    response.read()
+                    ok = response.status < 400
+            except urllib.error.HTTPError as e:
+                e.read()
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += 0 if ok else 1
+
+    queries_before = query_counter[0]
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round((query_counter[0] - queries_before) / max(len(latencies), 1), 2),
+    }
+
+
+def merge_rounds(rounds):
+    """같은 시나리오의 반복 측정 결과 -> 지연시간 / 처리량은 중앙값, 요청 / 오류 / 쿼리 수는 합계 기준"""
+    requests = sum(result['requests'] for result in rounds)
+    merged = {"requests": requests, "errors": sum(result['errors'] for result in rounds)}
+    for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+        merged[key] = round(statistics.median(result[key] for result in rounds), 2)
+    merged["queries_per_request"] = round(
+        sum(result['queries_per_request'] * result['requests'] for result in rounds) / max(requests, 1), 2)
+    return merged
+
+
+def run_speed(results, baseline):
+    """이번 실행이 기준값보다 전체적으로 느린 정도 (시간 비교 대상 시나리오의 p50 비율 중앙값, 1.0 = 같음)"""
+    ratios = [result['p50_ms'] / baseline[name]['p50_ms'] for name, result in results.items()
+              if name in baseline and baseline[name]['p50_ms'] > 0
+              and min(result['requests'], baseline[name]['requests']) >= MIN_TIMED_REQUESTS]
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def compare(results, baseline, tolerance, speed=None):
+    """기준값보다 요청당 쿼리 수가 늘어난 시나리오, speed 가 있으면 p50 이 느려지거나 처리량이 줄어든 시나리오 목록
+
+    speed 는 run_speed() 값 - 시간은 이 값으로 나눈 뒤 비교함 (None 이면 측정 환경이 달라 시간 비교를 하지 않음)
+    기준값이 없는 시나리오도 실패로 보고함 (새 시나리오를 추가하면 --save-baseline 으로 기준값 갱신)
+    """
+    regressions = []
+    ratio, slack = QUERY_TOLERANCE
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append(f"{name}: missing from baseline (re-run with --save-baseline)")
+            continue
+        if result['queries_per_request'] > base['queries_per_request'] * (1 + ratio) + slack:
+            regressions.append(f"{name}: queries/request {base['queries_per_request']} -> "
+                               f"{result['queries_per_request']}")
+        if speed is None or min(result['requests'], base['requests']) < MIN_TIMED_REQUESTS:
+            continue
+        if result['p50_ms'] / speed > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']} -> {result['p50_ms']} ms "
+                               f"({result['p50_ms'] / speed:.2f} ms at baseline speed)")
+        if result['rps'] * speed < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']} "
+                               f"({result['rps'] * speed:.1f} at baseline speed)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--schedules-per-user', type=int, default=20)
+    parser.add_argument('--photos-per-user', type=int, default=50)
+    parser.add_argument('--feedback', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=200, help='비율 1 인 시나리오의 요청 수')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3, help='전체 시나리오를 반복할 횟수 (시나리오별 중앙값 사용)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='기준값 대비 p50 / 처리량 허용 오차 (0.5 = 50%%)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db'))
+    # 실행 도중 캐시가 만료되는 시점이 실행 속도에 따라 달라지면 요청당 쿼리 수도 달라지므로 실행보다 길게
+    os.environ.setdefault('USER_CACHE_TTL', '3600')
+
+    from sqlalchemy import event
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import app as app_module
+    from app import app, db
+
+    with app.app_context():
+        app_module.run_migrations()
+        started = time.perf_counter()
+        seed(app_module, args.users, args.schedules_per_user, args.photos_per_user, args.feedback)
+        print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        query_counter = [0]
+        query_lock = threading.Lock()
+
+        def count_query(*_):
+            with query_lock:
+                query_counter[0] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    scenarios = build_scenarios(args.users)
+    covered = {name.split(' ', 1)[1].split('?')[0] for name, _, _ in scenarios}
+    routes = {rule.rule.replace('<string:', '<') for rule in app.url_map.iter_rules() if rule.endpoint != 'static'}
+    for route in sorted(routes - covered):
+        print(f"warning: no scenario for {route}")
+
+    rounds = {name: [] for name, _, _ in scenarios}
+    for number in range(args.rounds):
+        started = time.perf_counter()
+        for name, weight, make_request in scenarios:
+            total = max(1, int(args.requests * weight))
+            rounds[name].append(run_scenario(base_url, make_request, total, args.concurrency, query_counter))
+        print(f"round {number + 1}/{args.rounds}: {time.perf_counter() - started:.1f}s")
+
+    results = {name: merge_rounds(measured) for name, measured in rounds.items()}
+    print(f"{'scenario':<40}{'reqs':>6}{'err':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>7}")
+    for name, result in results.items():
+        print(f"{name:<40}{result['requests']:>6}{result['errors']:>5}{result['rps']:>9}"
+              f"{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}{result['queries_per_request']:>7}")
+    server.shutdown()
+    app_module.password_hasher.shutdown()
+
+    with app.app_context():
+        current = environment(app_module, args)
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"environment": current, "scenarios": results}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"baseline saved to {BASELINE_PATH}")
+
+    if args.compare:
+        with open(BASELINE_PATH, encoding='utf-8') as f:
+            baseline = json.load(f)
+        recorded = baseline.get('environment', {})
+        if current['load'] != recorded.get('load'):
+            # 데이터 양 / 요청 수가 다르면 캐시 적중률 등이 달라 요청당 쿼리 수도 비교할 수 없음
+            sys.exit(f"load parameters differ from baseline {recorded.get('load')}: "
+                     f"re-run with the same options or --save-baseline")
+        differs = sorted(key for key in current.keys() | recorded.keys() if current.get(key) != recorded.get(key))
+        scenarios = baseline.get('scenarios', {})
+        speed = None
+        if differs:
+            print(f"environment differs from baseline ({', '.join(differs)}): comparing queries/request only")
+        else:
+            speed = run_speed(results, scenarios)
+            print(f"run speed vs baseline: p50 x{speed:.2f} overall (timings are compared after dividing by this)")
+        regressions = compare(results, scenarios, args.tolerance, speed)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""로그인 처리량 측정: 요청 스레드에서 해시 계산 vs 해시 전용 프로세스 풀
+
+사용법:
+    python benchmarks/password_hashing.py --threads 8 --logins 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_logins(client, threads, logins):
+    counter = iter(range(logins))
+    lock = threading.Lock()
+    statuses = []
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            response = client.post('/login', json={"username": "bench", "password": "bench-password"})
+            with lock:
+                statuses.append(response.status_code)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='해시 프로세스 풀 크기')
+    parser.add_argument('--method', default=None, help='해시 방식 (기본: PASSWORD_HASH_METHOD)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'hash.db'))
+
+    import app as app_module
+
+    method = args.method or app_module.PASSWORD_HASH_METHOD
+    with app_module.app.app_context():
+        app_module.run_migrations()
+    client = app_module.app.test_client()
+    cores = os.cpu_count() or 1
+
+    for label, workers in (('inline', 0), (f'pool({args.workers})', args.workers)):
+        app_module.password_hasher.shutdown()
+        app_module.password_hasher = app_module.PasswordHasher(
+            method, workers, queue_limit=max(args.threads, 1) * 4, timeout=60
+        )
+        if label == 'inline':
+            client.post('/register', json={
+                "username": "bench", "password": "bench-password", "nickname": "bench",
+                "birthyear": 1990, "gender": "M"
+            })
+        elapsed, statuses = run_logins(client, args.threads, args.logins)
+        ok = statuses.count(200)
+        print(f'{label:>10}: {ok}/{len(statuses)} ok, {ok / elapsed:.1f} logins/s, '
+              f'{ok / elapsed / cores:.1f} logins/s/core ({cores} cores, method={method})')
+
+    app_module.password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
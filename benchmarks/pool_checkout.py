@@ -0,0 +1,71 @@
+"""SQLite 대체 DB 로 커넥션 풀 동작과 체크아웃 지연시간 측정
+
+사용법:
+    python benchmarks/pool_checkout.py --threads 32 --iterations 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--max-overflow', type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'pool.db')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{db_path}')
+    os.environ['DB_POOL_SIZE'] = str(args.pool_size)
+    os.environ['DB_MAX_OVERFLOW'] = str(args.max_overflow)
+
+    from sqlalchemy import text
+    from app import app, db
+
+    with app.app_context():
+        engine = db.engine
+
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            with engine.connect() as conn:
+                local.append(time.perf_counter() - started)
+                conn.execute(text('SELECT 1'))
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f'pool: {engine.pool.status()}')
+    print(f'checkouts: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)')
+    for pct in (50, 95, 99):
+        print(f'p{pct}: {percentile(latencies, pct) * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""읽기 / 쓰기 분리 확인: SQLite 파일 두 개를 primary / 복제본으로 사용
+
+- GET 요청의 SELECT 는 복제본으로, POST / PUT / DELETE 는 primary 로 가는지
+- 쓰기 직후 같은 사용자의 GET 은 READ_YOUR_WRITES_SECONDS 동안 primary 에서 읽는지 (read-your-writes)
+- 창이 지나면 다시 복제본에서 읽고, 복제가 따라오면 새 데이터가 보이는지
+를 엔진별 쿼리 수로 검사함 (실패하면 종료 코드 1). 복제는 sqlite3 backup 으로 흉내냄.
+
+사용법:
+    python benchmarks/read_replica.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serialization import sample_schedule  # noqa: E402
+
+WINDOW = 0.5
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    primary_path, replica_path = os.path.join(directory, 'primary.db'), os.path.join(directory, 'replica.db')
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + primary_path)
+    os.environ['DATABASE_REPLICA_URLS'] = 'sqlite:///' + replica_path
+    os.environ['READ_YOUR_WRITES_SECONDS'] = str(WINDOW)
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import app as app_module
+    from app import app, db
+
+    queries = {'primary': 0, 'replica': 0}
+    with app.app_context():
+        app_module.run_migrations()
+        for name, engine in (('primary', db.engines[None]), ('replica', db.engines['replica_0'])):
+            db.event.listen(engine, 'before_cursor_execute',
+                            lambda *args, name=name: queries.update({name: queries[name] + 1}))
+
+    def replicate():
+        with app.app_context():
+            db.engines['replica_0'].dispose()
+        with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+            source.backup(target)
+
+    client = app.test_client()
+    failures = []
+
+    def request(description, method, path, expect_engine, body=None):
+        before = dict(queries)
+        response = client.open(path, method=method, json=body)
+        used = {name for name in queries if queries[name] > before[name]}
+        ok = expect_engine is None or used <= {expect_engine}
+        print(f"{'ok  ' if ok else 'FAIL'} {description:<48} {response.status_code} -> {', '.join(sorted(used)) or '-'}")
+        if not ok:
+            failures.append(description)
+        return response
+
+    for name in ('alice', 'bob'):
+        request(f'POST /register {name}', 'POST', '/register', 'primary', {
+            "username": name, "password": "pw", "nickname": name, "birthyear": 1990, "gender": "F"
+        })
+    app_module.user_cache.clear()
+    replicate()
+    time.sleep(WINDOW)
+
+    request('GET /user/bob (no recent write)', 'GET', '/user/bob', 'replica')
+    schedule = dict(sample_schedule(1), username='alice', tripId='alice-1')
+    request('POST /schedule alice', 'POST', '/schedule', 'primary', schedule)
+    response = request('GET /schedule alice right after write', 'GET', '/schedule?username=alice', 'primary')
+    if len(response.get_json()) != 1:
+        failures.append('read-your-writes: new schedule missing')
+    request('GET /schedule bob', 'GET', '/schedule?username=bob', 'replica')
+
+    time.sleep(WINDOW)
+    response = request('GET /schedule alice after window (replica lags)', 'GET', '/schedule?username=alice', 'replica')
+    if response.get_json() != []:
+        failures.append('replica should not have the schedule before replication')
+    replicate()
+    response = request('GET /schedule alice after replication', 'GET', '/schedule?username=alice', 'replica')
+    if len(response.get_json()) != 1:
+        failures.append('replicated schedule missing')
+
+    # 복제본에 집계 행이 없으면 GET 안에서 재계산(쓰기) -> 그 뒤 쿼리는 primary
+    with sqlite3.connect(replica_path) as conn:
+        conn.execute('DELETE FROM feedback_stats')
+    response = request('GET /feedback/stats, row missing on replica', 'GET', '/feedback/stats', None)
+    if response.status_code != 200 or response.get_json()['count'] != 0:
+        failures.append('GET /feedback/stats with write inside GET')
+
+    app_module.password_hasher.shutdown()
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""일정 검색: n-gram 색인 조회와 LIKE '%검색어%' 전체 스캔 비교
+
+한 사용자에게 일정을 많이 등록한 뒤 같은 검색어로 두 방식을 반복 실행해서
+평균 응답 시간과 결과 수를 비교함 (색인은 import_schedules 가 등록하면서 함께 채움)
+
+- index: 점수 순 첫 페이지 (/schedule/search 와 같은 쿼리)
+- LIKE page: id 역순 첫 페이지 - 흔한 검색어는 앞부분만 읽고 끝나지만 점수 정렬은 불가
+- LIKE all: 점수 정렬 / 전체 개수에 필요한 전체 스캔
+
+사용법:
+    python benchmarks/search.py --schedules 20000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serialization import sample_schedule  # noqa: E402
+
+PLACES = ['제주도', '부산 해운대', '강릉 안목해변', '여수 밤바다', '경주 불국사', '전주 한옥마을', '속초', 'Seoul']
+THEMES = ['가족여행', '혼자 여행', '맛집 투어', '카페 투어', '바다 산책', 'night view', '등산', '캠핑']
+KEYWORDS = ['바다', '맛집', '야경', '카페', '한옥', '등산', '온천', '시장', 'ocean', 'coffee']
+RARE_KEYWORD = '스노클링'  # 일정 1% 에만 들어가는 드문 검색어
+QUERIES = ['제주', '해운대 맛집', '카페 투어', '한옥마을', 'ocean', '불국사 가족여행', RARE_KEYWORD]
+
+
+def make_items(count, username):
+    rng = random.Random(0)
+    items = []
+    for index in range(count):
+        item = sample_schedule(index)
+        item.update(
+            username=username, tripId=f"{username}-{index}",
+            title=f"{rng.choice(PLACES)} {rng.choice(THEMES)} {index}",
+            keywords=rng.sample(KEYWORDS, 3) + ([RARE_KEYWORD] if index % 100 == 0 else []),
+            summary=f"{rng.choice(PLACES)}에서 {rng.choice(THEMES)}를 즐기는 일정",
+        )
+        items.append(item)
+    return items
+
+
+def timed(repeat, run):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--schedules', type=int, default=20000, help='검색 대상 사용자의 일정 수')
+    parser.add_argument('--other-users', type=int, default=4, help='같은 수의 일정을 가진 다른 사용자 수')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'search.db'))
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import app as app_module
+    from app import app, db, User, TravelSchedule, ScheduleSearchResource, SCHEDULE_SUMMARY_FIELDS
+
+    with app.app_context():
+        app_module.run_migrations()
+        usernames = ['searcher'] + [f'other{index}' for index in range(args.other_users)]
+        db.session.execute(db.insert(User), [
+            {"username": name, "nickname": name, "password_hash": "-", "birthyear": 1990, "gender": "F"}
+            for name in usernames
+        ])
+        db.session.commit()
+
+        started = time.perf_counter()
+        for name in usernames:
+            app_module.import_schedules(TravelSchedule, make_items(args.schedules, name))
+        print(f"seeded {args.schedules * len(usernames)} schedules (with search index) "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        user_id = db.session.query(User.id).filter_by(username='searcher').scalar()
+        resource = ScheduleSearchResource(TravelSchedule)
+        serialize = app_module.make_schedule_serializer(SCHEDULE_SUMMARY_FIELDS)
+        options = app_module.schedule_load_options(TravelSchedule, SCHEDULE_SUMMARY_FIELDS)
+
+        def indexed(query):
+            terms = sorted(set(app_module.search_terms(query)))
+            with app.test_request_context():
+                data, _, _ = resource.search(user_id, terms, SCHEDULE_SUMMARY_FIELDS, args.limit, None)
+            return data
+
+        def like_scan(query, limit):
+            # 기존 방식: 단어마다 제목 / 요약 / 키워드 중 하나에 포함되는지 LIKE 로 확인
+            conditions = [
+                app_module.or_(TravelSchedule.title.like(f'%{word}%'), TravelSchedule.summary.like(f'%{word}%'),
+                               TravelSchedule.keywords_json.like(f'%{word}%'))
+                for word in query.split()
+            ]
+            rows = (TravelSchedule.query.options(*options).filter_by(user_id=user_id).filter(*conditions)
+                    .order_by(TravelSchedule.id.desc()).limit(limit).all())
+            return [serialize(row) for row in rows]
+
+        print(f"{'query':<18}{'index ms':>10}{'LIKE page':>11}{'LIKE all':>10}{'vs all':>8}"
+              f"{'index n':>9}{'LIKE n':>8}{'matches':>9}")
+        for query in QUERIES:
+            index_ms, index_rows = timed(args.repeat, lambda: indexed(query))
+            page_ms, page_rows = timed(args.repeat, lambda: like_scan(query, args.limit))
+            all_ms, all_rows = timed(args.repeat, lambda: like_scan(query, None))
+            print(f"{query:<18}{index_ms:>10.2f}{page_ms:>11.2f}{all_ms:>10.2f}{all_ms / index_ms:>7.1f}x"
+                  f"{len(index_rows):>9}{len(page_rows):>8}{len(all_rows):>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""일정 1,000건 직렬화 시간 측정: 기존 dict + json.loads/dumps 방식 vs RowSerializer
+
+사용법:
+    python benchmarks/serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_schedule(index):
+    return {
+        "username": "bench", "tripId": f"bench-{index}", "timestamp": "2024-05-01T09:30:00.000Z",
+        "title": f"부산 해운대 여행 {index}", "companion": "친구", "startDate": "2024-05-03",
+        "endDate": "2024-05-06", "duration": "3박4일", "budget": "50만원",
+        "transportation": ["KTX", "버스"], "keywords": ["바다", "맛집", "야경"],
+        "summary": "해운대와 광안리를 중심으로 한 3박4일 일정",
+        "days": [
+            {"day": day, "places": [
+                {"name": f"장소 {day}-{stop}", "time": f"{9 + stop}:00", "memo": "근처 카페에서 휴식"}
+                for stop in range(6)
+            ]}
+            for day in range(1, 5)
+        ],
+        "extraInfo": {"tips": ["주말에는 붐빔", "우산 챙기기"]},
+        "generatedScheduleRaw": "1일차: 해운대 해수욕장 → 동백섬 → 더베이101\n" * 20,
+    }
+
+
+def legacy_serialize(schedule):
+    # 기존 리소스 코드와 같은 방식 (strftime + json.loads 후 json.dumps 로 다시 인코딩)
+    return {
+        "id": schedule.id,
+        "tripId": schedule.trip_id,
+        "timestamp": schedule.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "title": schedule.title,
+        "companion": schedule.companion,
+        "startDate": schedule.start_date.strftime("%Y-%m-%d"),
+        "endDate": schedule.end_date.strftime("%Y-%m-%d"),
+        "duration": schedule.duration,
+        "budget": schedule.budget,
+        "transportation": json.loads(schedule.transportation_json),
+        "keywords": json.loads(schedule.keywords_json),
+        "summary": schedule.summary,
+        "days": json.loads(schedule.days_json),
+        "extraInfo": json.loads(schedule.extra_info_json),
+        "generatedScheduleRaw": schedule.generated_schedule_raw
+    }
+
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'serialize.db'))
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import app as app_module
+    from app import app, TravelSchedule
+
+    with app.app_context():
+        app_module.run_migrations()
+    client = app.test_client()
+    client.post('/register', json={
+        "username": "bench", "password": "pw", "nickname": "bench", "birthyear": 1990, "gender": "M"
+    })
+    with app.app_context():
+        app_module.import_schedules(TravelSchedule, [sample_schedule(i) for i in range(args.rows)])
+        fields = tuple(app_module.SCHEDULE_FIELDS)
+        rows = TravelSchedule.query.options(*app_module.schedule_load_options(TravelSchedule, fields)).all()
+        serializer = app_module.make_schedule_serializer(fields)
+
+        legacy = measure(lambda: json.dumps([legacy_serialize(row) for row in rows]), args.repeat)
+        compiled = measure(lambda: app_module.dumps_json([serializer(row) for row in rows]), args.repeat)
+
+    scale = 1000.0 / len(rows)
+    encoder = 'orjson' if app_module.ORJSON_FRAGMENT else 'stdlib json'
+    print(f'rows: {len(rows)}, encoder: {encoder}')
+    print(f'legacy dict + json.loads/dumps: {legacy * scale * 1000:8.2f} ms / 1000 schedules')
+    print(f'RowSerializer.to_json + encode:  {compiled * scale * 1000:8.2f} ms / 1000 schedules')
+    print(f'speedup: {legacy / compiled:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""워커 부팅 시간 측정: app 모듈 import / create_app() 시간과 import 시 DB 접속 여부 확인
+
+import 시간이 예산을 넘거나 import 만으로 DB 에 접속하면 종료 코드 1
+
+사용법:
+    python benchmarks/startup_time.py --runs 5 --budget 2.0
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({'SQLALCHEMY_DATABASE_URI': app.DATABASE_URL})
+created = time.perf_counter()
+print(imported - started, created - imported)
+"""
+
+# gunicorn --preload 처럼 부모에서 import / 쿼리 후 fork 한 자식이 새 커넥션을 쓰는지 확인
+FORK_SNIPPET = """
+import os
+import app
+from sqlalchemy import text
+with app.app.app_context():
+    app.db.session.execute(text('SELECT 1'))
+    app.db.session.remove()
+    parent_pool = app.db.engine.pool
+    pid = os.fork()
+    if pid == 0:
+        ok = app.db.engine.pool.checkedin() == 0 and app.db.session.execute(text('SELECT 1')).scalar() == 1
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    print(os.waitstatus_to_exitcode(status))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=2.0, help='app 모듈 import 허용 시간(초, 중앙값 기준)')
+    args = parser.parse_args()
+
+    failed = False
+    import_times, create_times = [], []
+    for _ in range(args.runs):
+        db_path = os.path.join(tempfile.mkdtemp(), 'startup.db')
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}')
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout.split()
+        import_times.append(float(output[0]))
+        create_times.append(float(output[1]))
+        if os.path.exists(db_path):
+            print('FAIL: importing app opened a database connection')
+            failed = True
+
+    import_median = statistics.median(import_times)
+    print(f'import app:   median {import_median * 1000:.0f} ms, max {max(import_times) * 1000:.0f} ms '
+          f'(budget {args.budget * 1000:.0f} ms)')
+    print(f'create_app(): median {statistics.median(create_times) * 1000:.1f} ms')
+    if import_median > args.budget:
+        print('FAIL: import time over budget')
+        failed = True
+
+    if hasattr(os, 'fork'):
+        env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'fork.db'))
+        code = subprocess.run(
+            [sys.executable, '-c', FORK_SNIPPET], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout.strip()
+        print(f"preload/fork: {'OK' if code == '0' else 'FAIL'}")
+        failed = failed or code != '0'
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
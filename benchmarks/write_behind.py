@@ -0,0 +1,120 @@
+"""피드백 / 사진 등록: 요청마다 커밋 vs 쓰기 지연 (write-behind) 비교
+
+여러 스레드가 동시에 POST /feedback, POST /photos 를 호출해서 처리량과 커밋 수를 비교하고,
+버퍼를 비운 뒤 저장된 행 수와 /feedback/stats 집계가 요청 수와 일치하는지 확인함
+(불일치하면 종료 코드 1). 마지막으로 버퍼를 작게 잡아 503 + Retry-After 가 나오는지 확인.
+
+사용법:
+    python benchmarks/write_behind.py --threads 16 --requests 4000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=4000, help='모드마다 보낼 요청 수 (피드백 / 사진 반씩)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'write_behind.db'))
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import app as app_module
+    from app import app, db, Feedback, Photo, User, write_behind
+
+    with app.app_context():
+        app_module.run_migrations()
+        db.session.add(User(username='bench', nickname='bench', password_hash='-', birthyear=1990, gender='F'))
+        db.session.commit()
+        commits = Counter()
+        db.event.listen(db.engine, 'commit', lambda conn: commits.update(['commit']))
+    write_behind.init_app(app)
+    client = app.test_client()
+
+    def post(index):
+        if index % 2:
+            return client.post('/feedback', json={"rating": 1 + index % 5, "deduction": index % 3, "comment": "좋아요"})
+        return client.post('/photos', json={
+            "username": "bench", "photoUri": f"https://example.com/{index}.jpg", "location": "제주",
+            "timestamp": "2024-05-01T10:00:00.000Z"
+        })
+
+    def run(total):
+        statuses = Counter()
+        lock = threading.Lock()
+        remaining = iter(range(total))
+
+        def worker():
+            while True:
+                with lock:
+                    index = next(remaining, None)
+                if index is None:
+                    return
+                response = post(index)
+                with lock:
+                    statuses[response.status_code] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses, time.perf_counter() - started
+
+    def row_counts():
+        with app.app_context():
+            return db.session.query(Feedback).count(), db.session.query(Photo).count()
+
+    ok = True
+    print(f"{'mode':<14}{'reqs':>6}{'req/s':>9}{'commits':>9}{'statuses':>22}")
+    for mode in ('sync', 'write-behind'):
+        app_module.WRITE_BEHIND = mode == 'write-behind'
+        before = row_counts()
+        commits.clear()
+        statuses, elapsed = run(args.requests)
+        rps = args.requests / elapsed
+        flushed = write_behind.flush(timeout=30)
+        after = row_counts()
+        print(f"{mode:<14}{args.requests:>6}{rps:>9.0f}{commits['commit']:>9}{str(dict(statuses)):>22}")
+
+        expected = (args.requests // 2, args.requests - args.requests // 2)
+        saved = (after[0] - before[0], after[1] - before[1])
+        if not flushed or saved != expected:
+            print(f"  FAIL: saved (feedback, photos) = {saved}, expected {expected}")
+            ok = False
+
+    stats = client.get('/feedback/stats').get_json()
+    feedback_total = row_counts()[0]
+    print(f"feedback rows {feedback_total}, /feedback/stats count {stats['count']}")
+    ok = ok and stats['count'] == feedback_total
+
+    # 역압: 버퍼를 작게 잡고 기록을 늦추면 503 + Retry-After
+    write_behind.max_rows, write_behind.flush_ms, write_behind.batch_size = 50, 2000, 10000
+    statuses, _ = run(500)
+    response = post(1)
+    print(f"back-pressure (max 50 rows): {dict(statuses)}, Retry-After {response.headers.get('Retry-After')}")
+    ok = ok and statuses[503] > 0 and response.status_code == 503
+    write_behind.flush(timeout=30)
+
+    # sync=1 이면 쓰기 지연 모드에서도 바로 커밋하고 id 반환
+    response = client.post('/feedback?sync=1', json={"rating": 5, "deduction": 0, "comment": "sync"})
+    print(f"sync=1: {response.status_code} {response.get_json()}")
+    ok = ok and response.status_code == 201 and 'feedback_id' in response.get_json()
+
+    write_behind.close()
+    app_module.password_hasher.shutdown()
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+"""gunicorn 설정 (gunicorn 은 실행 디렉터리의 gunicorn.conf.py 를 자동으로 읽음)
+
+Azure App Service 기본 시작 명령(gunicorn ... app:app)으로 배포해도 워커를 띄우기 전에
+스키마 마이그레이션(flask --app app migrate)을 한 번 적용함 - 실패하면 서버를 시작하지 않음
+MIGRATE_ON_START=0 이면 건너뜀 (이 경우 배포 후 flask --app app migrate 를 직접 실행해야 함)
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def on_starting(server):
+    if os.getenv('MIGRATE_ON_START', '1') != '1':
+        return
+    # 마스터 프로세스가 app 을 import 하거나 DB 커넥션을 갖고 fork 하지 않도록 별도 프로세스에서 실행
+    server.log.info("Applying schema migrations")
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'migrate'], cwd=ROOT, check=True)
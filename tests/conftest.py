@@ -0,0 +1,40 @@
+"""테스트 공통 설정 - 테스트마다 임시 SQLite 파일을 primary 로 쓰는 앱을 create_app 으로 새로 만듦"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app 을 import 하면 기본 앱이 만들어지므로 SQL Server 대신 SQLite 를 쓰도록 먼저 지정
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'default.db'))
+# 해시 비용은 테스트 대상이 아니므로 최소화
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """create_app(config) 후 마이그레이션까지 적용한 앱을 만드는 함수 (primary 는 tmp_path/primary.db)"""
+    apps = []
+
+    def make(**config):
+        config.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+        app = app_module.create_app(config)
+        with app.app_context():
+            app_module.run_migrations()
+        apps.append(app)
+        return app
+
+    # username -> id 캐시는 모듈 전역이므로 다른 테스트의 DB 에서 읽은 id 가 남지 않도록 비움
+    app_module.user_cache.clear()
+    yield make
+    app_module.user_cache.clear()
+    for app in apps:
+        with app.app_context():
+            for engine in app_module.db.engines.values():
+                engine.dispose()
@@ -0,0 +1,113 @@
+"""읽기 / 쓰기 분리: SQLite 파일 두 개를 primary / 복제본으로 쓰고 엔진별 쿼리 수로 라우팅을 확인
+
+복제는 sqlite3 backup 으로 흉내냄 (replicate() 를 부르기 전까지 복제본은 뒤처진 상태)
+"""
+import sqlite3
+import time
+
+import pytest
+
+import app as app_module
+
+WINDOW = 0.3  # 테스트용 READ_YOUR_WRITES_SECONDS
+
+
+class ReplicatedApp:
+    def __init__(self, app, primary_path, replica_path):
+        self.app = app
+        self.client = app.test_client()
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.queries = {'primary': 0, 'replica': 0}
+        with app.app_context():
+            for name, engine in (('primary', app_module.db.engines[None]),
+                                 ('replica', app_module.db.engines['replica_0'])):
+                app_module.db.event.listen(engine, 'before_cursor_execute',
+                                           lambda *args, name=name: self.count(name))
+
+    def count(self, name):
+        self.queries[name] += 1
+
+    def replicate(self):
+        with self.app.app_context():
+            app_module.db.engines['replica_0'].dispose()
+        with sqlite3.connect(self.primary_path) as source, sqlite3.connect(self.replica_path) as target:
+            source.backup(target)
+
+    def request(self, method, path, body=None):
+        """(응답, 쿼리를 실행한 엔진 이름 집합) - 스트리밍 응답은 본문까지 읽은 뒤 집계"""
+        before = dict(self.queries)
+        response = self.client.open(path, method=method, json=body)
+        response.get_data()
+        return response, {name for name in self.queries if self.queries[name] > before[name]}
+
+    def register(self, username):
+        response, used = self.request('POST', '/register', {
+            "username": username, "password": "pw", "nickname": username, "birthyear": 1990, "gender": "F"
+        })
+        assert response.status_code == 201
+        return used
+
+
+def schedule(username, trip_id):
+    return {
+        "username": username, "tripId": trip_id, "timestamp": "2024-05-01T09:30:00.000Z", "title": "부산 여행",
+        "startDate": "2024-05-03", "endDate": "2024-05-06", "duration": "3박4일", "days": [{"day": 1}],
+    }
+
+
+@pytest.fixture
+def replicated(make_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'write_tracker', app_module.WriteTracker(WINDOW, 100))
+    primary_path, replica_path = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    url = f"sqlite:///{replica_path}"
+    app = make_app(SQLALCHEMY_BINDS={'replica_0': dict(app_module.build_engine_options(url), url=url)})
+    return ReplicatedApp(app, primary_path, replica_path)
+
+
+def test_writes_go_to_primary_and_reads_to_replica(replicated):
+    assert replicated.register('alice') == {'primary'}
+    assert replicated.register('bob') == {'primary'}
+    replicated.replicate()
+    time.sleep(WINDOW)
+
+    response, used = replicated.request('GET', '/user/bob')
+    assert response.status_code == 200
+    assert used == {'replica'}
+    response, used = replicated.request('GET', '/schedule?username=alice')
+    assert (response.get_json(), used) == ([], {'replica'})
+
+
+def test_recent_writer_reads_from_primary_until_window_passes(replicated):
+    replicated.register('alice')
+    replicated.register('bob')
+    replicated.replicate()
+    time.sleep(WINDOW)
+
+    response, used = replicated.request('POST', '/schedule', schedule('alice', 'alice-1'))
+    assert (response.status_code, used) == (201, {'primary'})
+
+    # 쓴 사용자는 창이 끝날 때까지 primary 에서 읽어서 새 일정이 보임, 다른 사용자는 그대로 복제본
+    response, used = replicated.request('GET', '/schedule?username=alice')
+    assert (len(response.get_json()), used) == (1, {'primary'})
+    assert replicated.request('GET', '/schedule?username=bob')[1] == {'replica'}
+
+    # 창이 지나면 다시 복제본 - 복제 전에는 뒤처진 데이터, 복제 후에는 새 데이터
+    time.sleep(WINDOW)
+    response, used = replicated.request('GET', '/schedule?username=alice')
+    assert (response.get_json(), used) == ([], {'replica'})
+    replicated.replicate()
+    response, used = replicated.request('GET', '/schedule?username=alice')
+    assert (len(response.get_json()), used) == (1, {'replica'})
+
+
+def test_write_inside_get_switches_to_primary(replicated):
+    replicated.replicate()
+    # 복제본에 집계 행이 없으면 GET 안에서 다시 계산해서 primary 에 씀
+    with sqlite3.connect(replicated.replica_path) as conn:
+        conn.execute('DELETE FROM feedback_stats')
+
+    response, used = replicated.request('GET', '/feedback/stats')
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 0
+    assert 'primary' in used
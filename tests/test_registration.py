@@ -0,0 +1,70 @@
+"""동시 회원가입: unique 제약만으로 중복 사용자가 생기지 않고, 충돌은 실제 원인대로 보고되는지"""
+import threading
+from collections import Counter
+
+import app as app_module
+
+THREADS = 8
+USERS = 20
+
+
+def register(client, username, nickname):
+    response = client.post('/register', json={
+        "username": username, "password": "pw", "nickname": nickname, "birthyear": 1990, "gender": "F"
+    })
+    return response.status_code, response.get_json()['message']
+
+
+def test_concurrent_registration_creates_each_user_once(make_app):
+    app = make_app()
+    client = app.test_client()
+    results = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def worker(index):
+        barrier.wait()
+        for user in range(USERS):
+            # 짝수 스레드는 username 충돌, 홀수 스레드는 nickname 만 충돌
+            username = f'user{user}' if index % 2 == 0 else f'user{user}-{index}'
+            result = register(client, username, f'nick{user}')
+            with lock:
+                results[result] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results[(201, "User created successfully")] == USERS
+    assert set(results) <= {
+        (201, "User created successfully"),
+        (400, "Username already exists"),
+        (400, "Nickname already exists"),
+    }
+    with app.app_context():
+        assert app_module.User.query.count() == USERS
+        assert app_module.db.session.query(app_module.User.nickname).distinct().count() == USERS
+
+
+def test_duplicate_messages_name_the_colliding_field(make_app):
+    client = make_app().test_client()
+    assert register(client, 'alice', 'al') == (201, "User created successfully")
+    assert register(client, 'alice', 'other') == (400, "Username already exists")
+    assert register(client, 'bob', 'al') == (400, "Nickname already exists")
+
+
+def test_nickname_change_reports_only_real_collisions(make_app):
+    client = make_app().test_client()
+    register(client, 'alice', 'al')
+    register(client, 'bob', 'bo')
+
+    response = client.put('/user/bob', json={"nickname": "al"})
+    assert (response.status_code, response.get_json()['message']) == (400, "Nickname already exists")
+    # 자기 닉네임으로 바꾸는 것은 충돌이 아님
+    assert client.put('/user/bob', json={"nickname": "bo"}).status_code == 200
+    # NOT NULL 위반은 닉네임 중복으로 보고하지 않음
+    response = client.put('/user/bob', json={"birthyear": None})
+    assert response.status_code == 400
+    assert response.get_json()['message'] != "Nickname already exists"